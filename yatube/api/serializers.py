@@ -0,0 +1,74 @@
+"""Сериализация постов и комментариев с выборочными полями.
+
+Для каждого поля известны нужные столбцы, поэтому запрос через only()
+и select_related читает ровно то, что попадёт в ответ.
+"""
+from operator import attrgetter
+
+from posts.models import Comment, Post
+
+
+class UnknownField(ValueError):
+    pass
+
+
+def _image_url(post):
+    return post.image.url if post.image else None
+
+
+# поле: (столбцы запроса, функция получения значения)
+POST_FIELDS = {
+    'id': (('id',), attrgetter('id')),
+    'text': (('text',), attrgetter('text')),
+    'pub_date': (('pub_date',), lambda post: post.pub_date.isoformat()),
+    'author': (('author', 'author__username'), attrgetter('author.username')),
+    'group': (
+        ('group', 'group__slug'),
+        lambda post: post.group.slug if post.group else None,
+    ),
+    'image': (('image',), _image_url),
+    'comments_count': (('comments_count',), attrgetter('comments_count')),
+}
+
+COMMENT_FIELDS = {
+    'id': (('id',), attrgetter('id')),
+    'post': (('post',), attrgetter('post_id')),
+    'author': (
+        ('author', 'author__username'), attrgetter('author.username')),
+    'text': (('text',), attrgetter('text')),
+    'created': (('created',), lambda comment: comment.created.isoformat()),
+}
+
+
+def parse_fields(value, known):
+    """Список полей из параметра ?fields=a,b; пустой — все поля."""
+    if not value:
+        return list(known)
+    fields = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in known]
+    if unknown:
+        raise UnknownField(f'Неизвестные поля: {", ".join(unknown)}')
+    return fields
+
+
+def queryset(model, known, fields, keys):
+    """Запрос только за столбцами полей fields и ключей пагинации keys."""
+    columns = {*keys}
+    for name in fields:
+        columns.update(known[name][0])
+    related = {column.split('__')[0] for column in columns if '__' in column}
+    queryset = model.objects.only(*columns)
+    # select_related() без аргументов присоединил бы все связи
+    return queryset.select_related(*related) if related else queryset
+
+
+def post_queryset(fields, keys=('pub_date', 'id')):
+    return queryset(Post, POST_FIELDS, fields, keys)
+
+
+def comment_queryset(fields, keys=('created', 'id')):
+    return queryset(Comment, COMMENT_FIELDS, fields, keys)
+
+
+def serialize(obj, known, fields):
+    return {name: known[name][1](obj) for name in fields}
@@ -0,0 +1,120 @@
+import base64
+import json
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+
+POSTS_URL = reverse('api:posts')
+FOLLOW_URL = reverse('api:follow_posts')
+# Курсоры, которые декодируются, но содержат негодные значения
+TAMPERED_CURSORS = [
+    base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+    for data in (
+        [1, ['garbage', 'x']],
+        [1, {'a': 1}],
+        [1, [None, None]],
+    )
+]
+
+
+class ApiViewsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='author')
+        cls.reader = User.objects.create(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author, group=cls.group, text=f'Пост {number}')
+            for number in range(3)
+        ]
+        Comment.objects.create(
+            post=cls.posts[0], author=cls.reader, text='Комментарий')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.GROUP_URL = reverse('api:group_posts', args=[cls.group.slug])
+        cls.AUTHOR_URL = reverse('api:author_posts', args=['author'])
+        cls.DETAIL_URL = reverse('api:post_detail', args=[cls.posts[0].id])
+        cls.COMMENTS_URL = reverse('api:comments', args=[cls.posts[0].id])
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_feeds_return_posts(self):
+        """Ленты отдают посты новыми первыми."""
+        for url in (POSTS_URL, self.GROUP_URL, self.AUTHOR_URL):
+            with self.subTest(url=url):
+                results = self.client.get(url).json()['results']
+                self.assertEqual(results[0]['id'], self.posts[-1].id)
+                self.assertEqual(results[0]['author'], 'author')
+                self.assertEqual(results[0]['group'], 'group')
+        results = self.reader_client.get(FOLLOW_URL).json()['results']
+        self.assertEqual(len(results), len(self.posts))
+
+    def test_cursor_pagination(self):
+        """Ссылка next ведёт на следующую страницу по курсору."""
+        first = self.client.get(POSTS_URL, {'limit': 2}).json()
+        self.assertIsNone(first['previous'])
+        second = self.client.get(first['next']).json()
+        self.assertEqual(
+            [post['id'] for post in first['results'] + second['results']],
+            [post.id for post in reversed(self.posts)])
+        self.assertIsNone(second['next'])
+
+    def test_tampered_cursor_opens_first_page(self):
+        """Курсор с негодными значениями открывает первую страницу."""
+        for url in (POSTS_URL, self.COMMENTS_URL):
+            for cursor in TAMPERED_CURSORS:
+                with self.subTest(url=url, cursor=cursor):
+                    response = self.client.get(url, {'after': cursor})
+                    self.assertEqual(response.status_code, 200)
+                    self.assertIsNone(response.json()['previous'])
+
+    def test_sparse_fields(self):
+        """?fields= ограничивает поля ответа и запрашиваемые столбцы."""
+        with self.assertNumQueries(1):
+            data = self.client.get(POSTS_URL, {'fields': 'id,text'}).json()
+        self.assertEqual(set(data['results'][0]), {'id', 'text'})
+        response = self.client.get(POSTS_URL, {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_detail_and_comments(self):
+        """Пост и комментарии к нему отдаются отдельными адресами."""
+        post = self.client.get(self.DETAIL_URL).json()
+        self.assertEqual(post['comments_count'], 1)
+        comments = self.client.get(self.COMMENTS_URL).json()['results']
+        self.assertEqual(comments[0]['author'], 'reader')
+        missing = reverse('api:post_detail', args=[0])
+        self.assertEqual(self.client.get(missing).status_code, 404)
+
+    def test_etag(self):
+        """Повторный запрос с If-None-Match получает 304 до изменения."""
+        etag = self.client.get(self.COMMENTS_URL)['ETag']
+        response = self.client.get(
+            self.COMMENTS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Comment.objects.create(
+            post=self.posts[0], author=self.author, text='Ответ')
+        response = self.client.get(
+            self.COMMENTS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 2)
+
+    def test_comment_changes_list_etag(self):
+        """Новый комментарий меняет ETag списков: в них comments_count."""
+        etag = self.client.get(POSTS_URL)['ETag']
+        Comment.objects.create(
+            post=self.posts[0], author=self.author, text='Ответ')
+        response = self.client.get(POSTS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][-1]['comments_count'], 2)
+
+    def test_follow_feed_requires_login(self):
+        """Лента подписок без входа отвечает 401."""
+        self.assertEqual(self.client.get(FOLLOW_URL).status_code, 401)
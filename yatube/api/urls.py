@@ -0,0 +1,15 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('posts/', views.posts, name='posts'),
+    path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('posts/<int:post_id>/comments/', views.comments, name='comments'),
+    path('groups/<slug:slug>/posts/', views.group_posts, name='group_posts'),
+    path('authors/<str:username>/posts/', views.author_posts,
+         name='author_posts'),
+    path('follow/posts/', views.follow_posts, name='follow_posts'),
+]
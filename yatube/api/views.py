@@ -0,0 +1,166 @@
+import hashlib
+from functools import wraps
+
+from django.http import JsonResponse
+from django.views.decorators.http import etag, require_safe
+
+from core import versions
+from core.budgets import query_budget
+from core.paginator import CursorPaginator
+from posts import lookups, timeline
+from posts.models import Group, Post, User
+from posts.utils import hydrate_posts
+from yatube.settings import API_MAX_LIMIT, POSTS_PER_PAGE
+
+from . import serializers
+
+
+def error(detail, status):
+    return JsonResponse({'detail': detail}, status=status)
+
+
+def api_login_required(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return error('Требуется вход', 401)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+def versioned_etag(*namespaces):
+    """ETag из версий данных и адреса запроса — без обращения к БД.
+
+    Шаблоны пространств имён подставляют аргументы URL и user_id.
+    Списки постов зависят и от «comments»: в них есть comments_count.
+    """
+    def etag_func(request, *args, **kwargs):
+        if any('{user_id}' in namespace for namespace in namespaces):
+            # пользователя читаем, только если он входит в ETag
+            kwargs['user_id'] = request.user.id
+        version = versions.get_version(*(
+            namespace.format(**kwargs) for namespace in namespaces
+        ))
+        return hashlib.md5(
+            f'{version}:{request.get_full_path()}'.encode()).hexdigest()
+    return etag(etag_func)
+
+
+def api_view(known):
+    """Разбирает ?fields= и отвечает 400 на неизвестные поля."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            try:
+                fields = serializers.parse_fields(
+                    request.GET.get('fields'), known)
+            except serializers.UnknownField as unknown:
+                return error(str(unknown), 400)
+            return view(request, fields, *args, **kwargs)
+        return require_safe(wrapper)
+    return decorator
+
+
+def get_limit(request):
+    try:
+        limit = int(request.GET.get('limit', POSTS_PER_PAGE))
+    except ValueError:
+        return POSTS_PER_PAGE
+    return min(max(limit, 1), API_MAX_LIMIT)
+
+
+def page_url(request, **cursor):
+    query = request.GET.copy()
+    query.pop('after', None)
+    query.pop('before', None)
+    query.update(cursor)
+    return request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+
+
+def get_page(request, queryset, keys):
+    paginator = CursorPaginator(queryset, get_limit(request), keys)
+    return paginator.get_cursor_page(
+        after=request.GET.get('after'), before=request.GET.get('before'))
+
+
+def page_response(request, page, known, fields):
+    return JsonResponse({
+        'results': [
+            serializers.serialize(obj, known, fields) for obj in page
+        ],
+        'next': page_url(request, after=page.next_cursor)
+        if page.has_next() else None,
+        'previous': page_url(request, before=page.previous_cursor)
+        if page.has_previous() else None,
+    })
+
+
+def posts_response(request, fields, **lookup):
+    page = get_page(
+        request, serializers.post_queryset(fields).filter(**lookup),
+        keys=('pub_date', 'id'))
+    return page_response(request, page, serializers.POST_FIELDS, fields)
+
+
+@query_budget(1)
+@versioned_etag('posts', 'comments')
+@api_view(serializers.POST_FIELDS)
+def posts(request, fields):
+    return posts_response(request, fields)
+
+
+@query_budget(1)
+@versioned_etag('posts', 'comments:{post_id}')
+@api_view(serializers.POST_FIELDS)
+def post_detail(request, fields, post_id):
+    post = serializers.post_queryset(fields).filter(pk=post_id).first()
+    if post is None:
+        return error('Пост не найден', 404)
+    return JsonResponse(
+        serializers.serialize(post, serializers.POST_FIELDS, fields))
+
+
+@query_budget(2)
+@versioned_etag('users', 'comments:{post_id}')
+@api_view(serializers.COMMENT_FIELDS)
+def comments(request, fields, post_id):
+    if not Post.objects.filter(pk=post_id).exists():
+        return error('Пост не найден', 404)
+    page = get_page(
+        request,
+        serializers.comment_queryset(fields).filter(post_id=post_id),
+        keys=('created', 'id'))
+    return page_response(request, page, serializers.COMMENT_FIELDS, fields)
+
+
+@query_budget(2)
+@versioned_etag('posts', 'comments')
+@api_view(serializers.POST_FIELDS)
+def group_posts(request, fields, slug):
+    group = lookups.get(Group, slug)
+    if group is None:
+        return error('Группа не найдена', 404)
+    return posts_response(request, fields, group_id=group.id)
+
+
+@query_budget(2)
+@versioned_etag('posts', 'comments')
+@api_view(serializers.POST_FIELDS)
+def author_posts(request, fields, username):
+    author = lookups.get(User, username)
+    if author is None:
+        return error('Автор не найден', 404)
+    return posts_response(request, fields, author_id=author.id)
+
+
+@query_budget(4)
+@api_login_required
+@versioned_etag('posts', 'comments', 'timelines', 'timeline:{user_id}')
+@api_view(serializers.POST_FIELDS)
+def follow_posts(request, fields):
+    page = get_page(request, timeline.get_timeline(request.user),
+                    keys=('pub_date', 'post_id'))
+    page.object_list = hydrate_posts(
+        [entry.post_id for entry in page],
+        serializers.post_queryset(fields))
+    return page_response(request, page, serializers.POST_FIELDS, fields)
@@ -0,0 +1,57 @@
+"""Бюджеты SQL-запросов для view.
+
+@query_budget(n) объявляет, сколько запросов может сделать view
+(включая чтение сессии и пользователя). InstrumentationMiddleware
+сверяет фактическое число с бюджетом: в продакшене превышение пишется
+в лог с отпечатками запросов, а под BudgetTestRunner тест падает.
+"""
+import re
+from collections import Counter
+
+from django.test.runner import DiscoverRunner
+
+# полное имя view: бюджет
+BUDGETS = {}
+
+STRICT = False
+
+LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s")
+IN_LIST_RE = re.compile(r'\bIN \((?:\?, )*\?\)')
+SPACE_RE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(limit):
+    def decorator(view):
+        view.query_budget = limit
+        BUDGETS[f'{view.__module__}.{view.__name__}'] = limit
+        return view
+    return decorator
+
+
+def fingerprint(sql):
+    """SQL без конкретных значений: одинаковые запросы N+1 совпадают."""
+    sql = LITERAL_RE.sub('?', sql)
+    return SPACE_RE.sub(' ', IN_LIST_RE.sub('IN (...)', sql)).strip()
+
+
+def fingerprints(statements, limit=5):
+    """Самые частые отпечатки запросов с числом повторов."""
+    return Counter(map(fingerprint, statements)).most_common(limit)
+
+
+class BudgetTestRunner(DiscoverRunner):
+    """Запуск тестов, в котором превышение бюджета — ошибка."""
+
+    def setup_test_environment(self, **kwargs):
+        global STRICT
+        super().setup_test_environment(**kwargs)
+        STRICT = True
+
+    def teardown_test_environment(self, **kwargs):
+        global STRICT
+        STRICT = False
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,384 @@
+"""Двухуровневый кеш: LRU в памяти процесса поверх общего файла SQLite.
+
+Второй уровень — таблица в файле SQLite на локальном диске, общая для
+всех воркеров: запись в одном процессе сразу видна остальным. Первый
+уровень — ограниченный по байтам LRU внутри процесса, чтобы частые
+ключи (версии, счётчики, фрагменты) не читались из файла.
+
+Согласованность уровней держится на штампах. Рядом с базой лежит файл,
+отображённый в память всех процессов (mmap), — массив 64-битных
+штампов; ключ попадает в ячейку по crc32. Запись ключа кладёт в его
+ячейку новое случайное значение, clear() — в общую нулевую ячейку.
+Копия в LRU помнит штампы на момент чтения и действительна, только пока
+они не изменились, а проверка — это чтение общей памяти без системных
+вызовов. Коллизия ячеек лишь изредка заставляет перечитать ключ.
+
+Запись в файл и смена штампа идут под одной блокировкой файла штампов,
+причём штамп меняется после COMMIT: читатель, увидевший новый штамп,
+прочтёт и новые данные, а штамп следующего писателя всегда новее —
+копия в LRU писателя не переживёт чужую запись.
+"""
+import fcntl
+import mmap
+import os
+import pickle
+import random
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+STAMP = struct.Struct('<Q')
+# Больше параметров в одном запросе старые сборки SQLite не принимают
+CHUNK_SIZE = 500
+
+# Общее состояние процесса по LOCATION: CacheHandler создаёт экземпляр
+# бэкенда на каждый поток, а LRU и штампы должны быть одни на процесс.
+_tiers = {}
+_tiers_lock = threading.Lock()
+
+
+class LocalCache:
+    """LRU первого уровня с учётом размера в байтах и сроком жизни.
+
+    Хранит значения сериализованными: так размер известен точно,
+    а вызывающий код не может изменить закешированный объект.
+    """
+
+    def __init__(self, max_bytes, timeout):
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.size = 0
+        # ключ: (pickle, истекает, штампы)
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, stamps):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            blob, expires, seen = entry
+            if seen != stamps or expires <= time.time():
+                self._drop(key)
+                return None
+            self.entries.move_to_end(key)
+            return blob
+
+    def put(self, key, blob, expires, stamps):
+        if len(blob) > self.max_bytes:
+            self.discard(key)
+            return
+        local_expires = time.time() + self.timeout
+        if expires is not None:
+            local_expires = min(expires, local_expires)
+        with self.lock:
+            self._drop(key)
+            self.entries[key] = (blob, local_expires, stamps)
+            self.size += len(blob)
+            while self.size > self.max_bytes:
+                self._drop(next(iter(self.entries)))
+
+    def discard(self, key):
+        with self.lock:
+            self._drop(key)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+
+    def _drop(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[0])
+
+
+class Stamps:
+    """Массив штампов в файле, общем для процессов через mmap."""
+
+    def __init__(self, path, slots):
+        self.slots = slots
+        size = STAMP.size * slots
+        # Дескриптор остаётся открытым для блокировки записи (lockf):
+        # её держит процесс, а потоки процесса разделяет thread_lock
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self.fd).st_size < size:
+            os.ftruncate(self.fd, size)
+        self.map = mmap.mmap(self.fd, size)
+        self.thread_lock = threading.Lock()
+
+    @contextmanager
+    def locked(self):
+        """Блокировка записи, общая для потоков и процессов."""
+        with self.thread_lock:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self.fd, fcntl.LOCK_UN)
+
+    def slot(self, key):
+        # crc32, а не hash(): хеш строк различается между процессами
+        return 1 + zlib.crc32(key.encode()) % (self.slots - 1)
+
+    def read(self, key):
+        return (
+            self.epoch(),
+            STAMP.unpack_from(self.map, STAMP.size * self.slot(key))[0],
+        )
+
+    def renew(self, slot):
+        # Случайное значение, а не +1: при гонке двух записей инкремент
+        # мог бы потеряться и оставить штамп прежним.
+        stamp = random.getrandbits(64)
+        STAMP.pack_into(self.map, STAMP.size * slot, stamp)
+        return stamp
+
+    def epoch(self):
+        return STAMP.unpack_from(self.map, 0)[0]
+
+    def touch(self, key):
+        """Новый штамп ключа; возвращает штампы, как read()."""
+        return self.epoch(), self.renew(self.slot(key))
+
+    def touch_all(self):
+        self.renew(0)
+
+
+class TieredCache(BaseCache):
+    """Кеш-бэкенд: LOCATION — каталог для файлов общего уровня.
+
+    OPTIONS (кроме стандартных MAX_ENTRIES и CULL_FREQUENCY):
+    LOCAL_MAX_BYTES — объём LRU процесса, LOCAL_TIMEOUT — сколько секунд
+    копия живёт в LRU, STAMP_SLOTS — число ячеек штампов.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        # В кеше сессии и пользователи: каталог и файлы — только владельцу,
+        # как у FileBasedCache
+        os.makedirs(location, 0o700, exist_ok=True)
+        self._path = os.path.join(location, 'cache.sqlite3')
+        if not os.path.exists(self._path):
+            os.close(os.open(self._path, os.O_RDWR | os.O_CREAT, 0o600))
+        self._writes = 0
+        self._connections = threading.local()
+        with _tiers_lock:
+            if location not in _tiers:
+                _tiers[location] = (
+                    LocalCache(
+                        int(options.get('LOCAL_MAX_BYTES', 16 * 2 ** 20)),
+                        int(options.get('LOCAL_TIMEOUT', 60)),
+                    ),
+                    Stamps(
+                        os.path.join(location, 'stamps'),
+                        int(options.get('STAMP_SLOTS', 2 ** 16)),
+                    ),
+                )
+            self._local, self._stamps = _tiers[location]
+
+    def _db(self):
+        connections = self._connections
+        # После fork соединение родителя использовать нельзя
+        if getattr(connections, 'pid', None) != os.getpid():
+            db = sqlite3.connect(self._path, timeout=5, isolation_level=None)
+            db.execute('PRAGMA journal_mode = WAL')
+            db.execute('PRAGMA synchronous = NORMAL')
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)'
+            )
+            connections.db, connections.pid = db, os.getpid()
+        return connections.db
+
+    @contextmanager
+    def _transaction(self, keys=(), everything=False):
+        """Транзакция записи; после COMMIT меняет штампы keys.
+
+        Отдаёт (db, stamps): в stamps после выхода лежат новые штампы
+        ключей, с которыми писатель кладёт значения в свой LRU.
+        """
+        db = self._db()
+        stamps = {}
+        with self._stamps.locked():
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                yield db, stamps
+            except BaseException:
+                db.execute('ROLLBACK')
+                raise
+            db.execute('COMMIT')
+            if everything:
+                self._stamps.touch_all()
+            for key in keys:
+                stamps[key] = self._stamps.touch(key)
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self._cull(db)
+
+    def _cull(self, db):
+        db.execute('DELETE FROM cache WHERE expires <= ?', (time.time(),))
+        count = db.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        if count <= self._max_entries:
+            return
+        # rowid растёт с каждой записью: удаляем давно записанные.
+        # Штампы не трогаем — копии в LRU процессов остаются верными.
+        db.execute(
+            'DELETE FROM cache WHERE rowid IN '
+            '(SELECT rowid FROM cache ORDER BY rowid LIMIT ?)',
+            (count // self._cull_frequency if self._cull_frequency
+             else count,),
+        )
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    @staticmethod
+    def _dumps(value):
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _alive(expires):
+        return expires is None or expires > time.time()
+
+    def _fetch(self, keys):
+        """Живые записи общего уровня: {ключ: (pickle, истекает)}."""
+        rows = {}
+        db = self._db()
+        keys = list(keys)
+        for start in range(0, len(keys), CHUNK_SIZE):
+            chunk = keys[start:start + CHUNK_SIZE]
+            rows.update(
+                (key, (blob, expires))
+                for key, blob, expires in db.execute(
+                    'SELECT key, value, expires FROM cache WHERE key IN '
+                    f'({", ".join("?" * len(chunk))})',
+                    chunk,
+                )
+                if self._alive(expires)
+            )
+        return rows
+
+    def get(self, key, default=None, version=None):
+        return self.get_many([key], version=version).get(key, default)
+
+    def get_many(self, keys, version=None):
+        found = {}
+        missing = {}
+        for original in keys:
+            key = self._key(original, version)
+            # Штампы читаем до файла: запись, случившаяся после чтения,
+            # сменит штамп и сделает копию в LRU недействительной.
+            stamps = self._stamps.read(key)
+            blob = self._local.get(key, stamps)
+            if blob is None:
+                missing[key] = (original, stamps)
+            else:
+                found[original] = pickle.loads(blob)
+        if not missing:
+            return found
+        for key, (blob, expires) in self._fetch(missing).items():
+            original, stamps = missing[key]
+            self._local.put(key, blob, expires, stamps)
+            found[original] = pickle.loads(blob)
+        return found
+
+    def has_key(self, key, version=None):
+        return key in self.get_many([key], version=version)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout, version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self.get_backend_timeout(timeout)
+        rows = [
+            (self._key(key, version), self._dumps(value), expires)
+            for key, value in data.items()
+        ]
+        keys = [key for key, _, _ in rows]
+        with self._transaction(keys) as (db, stamps):
+            db.executemany(
+                'INSERT OR REPLACE INTO cache (key, value, expires) '
+                'VALUES (?, ?, ?)',
+                rows,
+            )
+        for key, blob, expires in rows:
+            self._local.put(key, blob, expires, stamps[key])
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        blob = self._dumps(value)
+        expires = self.get_backend_timeout(timeout)
+        with self._transaction([key]) as (db, stamps):
+            added = db.execute(
+                'INSERT INTO cache (key, value, expires) VALUES (?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET value = excluded.value, '
+                'expires = excluded.expires WHERE cache.expires <= ?',
+                (key, blob, expires, time.time()),
+            ).rowcount
+        if added:
+            self._local.put(key, blob, expires, stamps[key])
+        return bool(added)
+
+    def incr(self, key, delta=1, version=None):
+        """Атомарно для всех процессов: чтение и запись в одной транзакции."""
+        original, key = key, self._key(key, version)
+        with self._transaction([key]) as (db, stamps):
+            row = db.execute(
+                'SELECT value, expires FROM cache WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or not self._alive(row[1]):
+                raise ValueError(f"Key '{original}' not found")
+            value = pickle.loads(row[0]) + delta
+            blob = self._dumps(value)
+            db.execute(
+                'UPDATE cache SET value = ? WHERE key = ?', (blob, key))
+        self._local.put(key, blob, row[1], stamps[key])
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        with self._transaction([key]) as (db, _):
+            touched = db.execute(
+                'UPDATE cache SET expires = ? WHERE key = ? '
+                'AND (expires IS NULL OR expires > ?)',
+                (self.get_backend_timeout(timeout), key, time.time()),
+            ).rowcount
+        self._local.discard(key)
+        return bool(touched)
+
+    def delete(self, key, version=None):
+        return self.delete_many([key], version=version)
+
+    def delete_many(self, keys, version=None):
+        keys = [self._key(key, version) for key in keys]
+        with self._transaction(keys) as (db, _):
+            deleted = sum(
+                db.execute(
+                    'DELETE FROM cache WHERE key IN '
+                    f'({", ".join("?" * len(chunk))})',
+                    chunk,
+                ).rowcount
+                for chunk in (
+                    keys[start:start + CHUNK_SIZE]
+                    for start in range(0, len(keys), CHUNK_SIZE)
+                )
+            )
+        for key in keys:
+            self._local.discard(key)
+        return bool(deleted)
+
+    def clear(self):
+        with self._transaction(everything=True) as (db, _):
+            db.execute('DELETE FROM cache')
+        self._local.clear()
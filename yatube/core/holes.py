@@ -0,0 +1,68 @@
+"""«Дырки» в кешируемых страницах: фрагменты, зависящие от пользователя.
+
+Страница, которую кеширует PageCacheMiddleware, рисуется без привязки
+к пользователю: на месте каждого {% hole %} остаётся метка с именем
+дырки и её аргументами. Перед отдачей fill() заменяет метки вторым,
+дешёвым проходом — все дырки одного имени заполняет один зарегистрированный
+рендерер, так что лайки десяти постов стоят одного запроса, а не десяти.
+
+Рендерер — функция (request, items) -> список HTML той же длины,
+где items — словари аргументов дырок.
+"""
+import base64
+import json
+import re
+from collections import defaultdict
+
+from django.template.loader import get_template
+
+RENDERERS = {}
+
+MARKER_RE = re.compile(r'<!--hole:(\w+):([A-Za-z0-9+/=]*)-->')
+
+
+def register(name, renderer):
+    RENDERERS[name] = renderer
+
+
+def template_renderer(template_name):
+    """Рендерер, который рисует шаблон с аргументами дырки в контексте."""
+    def render(request, items):
+        template = get_template(template_name)
+        return [template.render(item, request) for item in items]
+    return render
+
+
+def deferred(request):
+    """Оставлять ли дырки метками: страница пойдёт в общий кеш."""
+    return getattr(request, 'defer_holes', False)
+
+
+def marker(name, arguments):
+    # base64 без «-»: в HTML-комментарии не должно быть «--»
+    encoded = base64.b64encode(json.dumps(arguments).encode()).decode()
+    return f'<!--hole:{name}:{encoded}-->'
+
+
+def render(request, name, arguments):
+    """Одна дырка сразу, без меток."""
+    return RENDERERS[name](request, [arguments])[0]
+
+
+def fill(request, content):
+    """Заменяет метки в content фрагментами для request.user."""
+    found = defaultdict(dict)
+    for name, encoded in MARKER_RE.findall(content):
+        found[name][encoded] = json.loads(base64.b64decode(encoded))
+    rendered = {}
+    for name, items in found.items():
+        html = RENDERERS[name](request, list(items.values()))
+        rendered.update(
+            ((name, encoded), fragment)
+            for encoded, fragment in zip(items, html)
+        )
+    return MARKER_RE.sub(
+        lambda match: rendered[match.group(1), match.group(2)], content)
+
+
+register('nav', template_renderer('includes/nav_user.html'))
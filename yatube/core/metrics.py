@@ -0,0 +1,27 @@
+"""Реестр метрик процесса в текстовом формате Prometheus.
+
+Подсистемы регистрируют функции без аргументов, возвращающие число;
+view metrics отдаёт их только адресам из INTERNAL_IPS.
+"""
+from django.http import Http404, HttpResponse
+
+from yatube.settings import INTERNAL_IPS
+
+GAUGES = {}
+
+
+def register(name, func):
+    GAUGES[name] = func
+
+
+def collect():
+    return {name: func() for name, func in sorted(GAUGES.items())}
+
+
+def metrics(request):
+    if request.META.get('REMOTE_ADDR') not in INTERNAL_IPS:
+        raise Http404
+    return HttpResponse(
+        ''.join(f'{name} {value}\n' for name, value in collect().items()),
+        content_type='text/plain; version=0.0.4',
+    )
@@ -0,0 +1,104 @@
+"""Замер каждого запроса: SQL-запросы, время БД и шаблонов.
+
+Middleware оборачивает выполнение SQL через connection.execute_wrapper,
+а TimedDjangoTemplates (core.template_backends) добавляет время
+отрисовки шаблонов. Итог уходит в заголовок Server-Timing и одной
+JSON-строкой в лог core.middleware для последующей агрегации.
+"""
+import json
+import logging
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.db import connections
+
+from . import budgets
+from yatube.settings import SLOW_REQUEST_MS
+
+logger = logging.getLogger(__name__)
+
+current = ContextVar('request_stats', default=None)
+
+
+class RequestStats:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        # глубина вложенных отрисовок: время считает только внешняя
+        self.template_depth = 0
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.statements.append(sql)
+            self.db_time += time.perf_counter() - started
+
+
+def server_timing(**metrics):
+    return ', '.join(
+        f'{name};dur={seconds * 1000:.1f}' for name, seconds in metrics.items()
+    )
+
+
+class InstrumentationMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestStats()
+        token = current.set(stats)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            current.reset(token)
+        total = time.perf_counter() - started
+        # время шаблонов включает и запросы, сделанные при отрисовке
+        response['Server-Timing'] = server_timing(
+            db=stats.db_time, tpl=stats.template_time, total=total)
+        response['X-Query-Count'] = str(stats.queries)
+        self.log(request, response, stats, total)
+        self.check_budget(request, stats)
+        return response
+
+    def check_budget(self, request, stats):
+        match = getattr(request, 'resolver_match', None)
+        budget = getattr(match.func, 'query_budget', None) if match else None
+        if budget is None or stats.queries <= budget:
+            return
+        summary = {
+            'event': 'query_budget_exceeded',
+            'view': match.view_name,
+            'budget': budget,
+            'queries': stats.queries,
+            'fingerprints': budgets.fingerprints(stats.statements),
+        }
+        if budgets.STRICT:
+            raise budgets.QueryBudgetExceeded(
+                json.dumps(summary, ensure_ascii=False, indent=2))
+        logger.warning(json.dumps(summary, ensure_ascii=False))
+
+    def log(self, request, response, stats, total):
+        match = getattr(request, 'resolver_match', None)
+        total_ms = round(total * 1000, 1)
+        logger.log(
+            logging.WARNING if total_ms > SLOW_REQUEST_MS else logging.INFO,
+            json.dumps({
+                'view': match.view_name if match else None,
+                'method': request.method,
+                'status': response.status_code,
+                'queries': stats.queries,
+                'db_ms': round(stats.db_time * 1000, 1),
+                'template_ms': round(stats.template_time * 1000, 1),
+                'total_ms': total_ms,
+            }, ensure_ascii=False)
+        )
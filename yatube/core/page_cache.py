@@ -0,0 +1,80 @@
+"""Кеш целых страниц, общий для всех посетителей.
+
+View, помеченные @page_cache(*namespaces), кешируются по пути с query
+string и версиям namespaces; в шаблоне namespace можно подставлять
+аргументы из URL: 'comments:{post_id}', а вместо строки передать функцию
+от аргументов URL, которая вернёт namespace. Такие страницы всегда рисуются
+с метками на месте дырок (см. core.holes), а метки заполняются перед
+отдачей, поэтому и кешированные фрагменты в их шаблонах общие для всех.
+Наполняют кеш только гости, а тот же кешированный текст получает любой
+посетитель — вошедшим дырки заполняются для них вторым проходом, без
+вызова view, шаблонов страницы и контекст-процессоров.
+"""
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from yatube.settings import PAGE_CACHE_TIMEOUT
+
+from . import holes, versions
+
+KEY_PREFIX = 'page'
+
+
+def page_cache(*namespaces):
+    def decorator(view):
+        view.page_cache = namespaces
+        return view
+    return decorator
+
+
+def page_key(request, namespaces, view_kwargs):
+    namespaces = [
+        namespace(view_kwargs) if callable(namespace)
+        else namespace.format(**view_kwargs)
+        for namespace in namespaces
+    ]
+    version = versions.get_version(*namespaces)
+    return f'{KEY_PREFIX}:{version}:{request.get_full_path()}'
+
+
+class PageCacheMiddleware:
+    """Ставится последним: process_view видит уже найденный view."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not holes.deferred(request) or response.streaming:
+            return response
+        key = getattr(request, 'page_cache_key', None)
+        if key is not None and response.status_code == 200 and not (
+                response.cookies):
+            cache.set(key, (
+                response.content.decode(response.charset),
+                response['Content-Type'],
+            ), PAGE_CACHE_TIMEOUT)
+        return self.respond(request, response)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        namespaces = getattr(view_func, 'page_cache', None)
+        if namespaces is None or request.method != 'GET':
+            return None
+        key = page_key(request, namespaces, view_kwargs)
+        cached = cache.get(key)
+        if cached is not None:
+            content, content_type = cached
+            return self.respond(
+                request, HttpResponse(content, content_type=content_type))
+        if not request.user.is_authenticated:
+            request.page_cache_key = key
+        request.defer_holes = True
+        return None
+
+    def respond(self, request, response):
+        response.content = holes.fill(
+            request, response.content.decode(response.charset))
+        # Дырки зависят от сессии: общим HTTP-кешам нельзя смешивать
+        patch_vary_headers(response, ('Cookie',))
+        return response
@@ -0,0 +1,206 @@
+"""Пагинация: сжатая навигация по номерам и курсорная (keyset) выборка.
+
+ElidedPaginator показывает окно номеров вокруг текущей страницы
+с многоточиями, а у очень длинных лент — только «новее / старше».
+Общее число записей можно передать готовым (счётчик) или функцией
+(кеш) — тогда COUNT(*) не выполняется.
+
+В CursorPaginator вместо OFFSET страница выбирается условием по ключу
+сортировки (например, (pub_date, id)), поэтому глубокие страницы стоят
+столько же, сколько первая. Курсор — непрозрачный токен с ключом
+граничной записи и номером страницы, так что шаблон paginator.html
+продолжает работать с привычными number, has_next
+и previous_page_number.
+"""
+import base64
+import binascii
+import json
+from functools import reduce
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from yatube.settings import FEED_CACHE_TIMEOUT, PAGINATOR_MAX_NUMBERED_PAGES
+
+from . import versions
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+def cached_count(queryset, *namespaces):
+    """COUNT(*) ленты из кеша; сбрасывается сменой версий namespaces."""
+    key = f'count:{":".join(namespaces)}:{versions.get_version(*namespaces)}'
+    return cache.get_or_set(key, queryset.count, FEED_CACHE_TIMEOUT)
+
+
+class ElidedPage(Page):
+    @property
+    def window(self):
+        """Номера страниц для навигации; пропуски — paginator.ELLIPSIS."""
+        return self.paginator.get_elided_page_range(self.number)
+
+
+class ElidedPaginator(Paginator):
+    ELLIPSIS = '…'
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._count = count
+
+    @cached_property
+    def count(self):
+        """Готовое число записей, функция для него или COUNT(*)."""
+        if self._count is None:
+            return super().count
+        return self._count() if callable(self._count) else self._count
+
+    @property
+    def numbered(self):
+        """Показывать ли номера страниц; иначе только «новее / старше»."""
+        return self.num_pages <= PAGINATOR_MAX_NUMBERED_PAGES
+
+    def get_elided_page_range(self, number=1, on_each_side=2, on_ends=1):
+        """Окно номеров вокруг number и on_ends номеров с каждого края."""
+        last = self.num_pages
+        number = min(max(number, 1), last)
+        if last <= (on_each_side + on_ends) * 2 + 1:
+            yield from range(1, last + 1)
+            return
+        if number > on_ends + on_each_side + 2:
+            yield from range(1, on_ends + 1)
+            yield self.ELLIPSIS
+            yield from range(number - on_each_side, number + 1)
+        else:
+            yield from range(1, number + 1)
+        if number < last - on_ends - on_each_side - 1:
+            yield from range(number + 1, number + on_each_side + 1)
+            yield self.ELLIPSIS
+            yield from range(last - on_ends + 1, last + 1)
+        else:
+            yield from range(number + 1, last + 1)
+
+    def _get_page(self, *args, **kwargs):
+        return ElidedPage(*args, **kwargs)
+
+
+class CursorPage(ElidedPage):
+    def __init__(self, object_list, number, paginator,
+                 has_next, has_previous):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+        # Курсоры считаем сразу: object_list потом могут подменить
+        # «гидратированными» объектами без полей ключа.
+        self.next_cursor = self.previous_cursor = None
+        if object_list:
+            self.next_cursor = paginator.encode_cursor(
+                object_list[-1], number)
+            self.previous_cursor = paginator.encode_cursor(
+                object_list[0], number)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+
+class CursorPaginator(ElidedPaginator):
+    """Пагинатор по убыванию ключа keys; поддерживает и ?page=N."""
+
+    def __init__(self, object_list, per_page, keys=('pub_date', 'id'),
+                 **kwargs):
+        self.keys = keys
+        object_list = object_list.order_by(*(f'-{key}' for key in keys))
+        super().__init__(object_list, per_page, **kwargs)
+
+    def encode_cursor(self, obj, number):
+        field_values = [
+            self._field(key).value_to_string(obj) for key in self.keys
+        ]
+        data = json.dumps([number, field_values]).encode()
+        return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            number, field_values = json.loads(data.decode())
+            if (not isinstance(number, int)
+                    or not isinstance(field_values, list)
+                    or len(field_values) != len(self.keys)):
+                raise InvalidCursor('Некорректный курсор')
+            values = [
+                self._field(key).to_python(value)
+                for key, value in zip(self.keys, field_values)
+            ]
+        except (binascii.Error, ValueError, TypeError, UnicodeDecodeError,
+                ValidationError):
+            raise InvalidCursor('Некорректный курсор')
+        # None прошёл бы to_python, но не сравнение в фильтре
+        if None in values:
+            raise InvalidCursor('Некорректный курсор')
+        return number, values
+
+    def get_cursor_page(self, after=None, before=None):
+        """Страница после (или перед) курсором; при ошибке — первая."""
+        try:
+            if after:
+                return self._page_after(*self.decode_cursor(after))
+            if before:
+                return self._page_before(*self.decode_cursor(before))
+        except InvalidCursor:
+            pass
+        return self._page_after(0, None)
+
+    def _page_after(self, number, values):
+        queryset = self.object_list
+        if values is not None:
+            queryset = queryset.filter(self._beyond(values, 'lt'))
+        items = list(queryset[:self.per_page + 1])
+        return CursorPage(
+            items[:self.per_page], number + 1, self,
+            has_next=len(items) > self.per_page,
+            has_previous=values is not None,
+        )
+
+    def _page_before(self, number, values):
+        queryset = self.object_list.reverse().filter(
+            self._beyond(values, 'gt'))
+        items = list(queryset[:self.per_page + 1])
+        if len(items) <= self.per_page:
+            return self._page_after(0, None)
+        return CursorPage(
+            items[self.per_page - 1::-1], max(number - 1, 2), self,
+            has_next=True,
+            has_previous=True,
+        )
+
+    def _beyond(self, values, lookup):
+        """Условие «ключ строго дальше values» в лексикографическом порядке."""
+        conditions = []
+        for position, key in enumerate(self.keys):
+            equal = {k: v for k, v in zip(self.keys[:position], values)}
+            conditions.append(
+                Q(**equal, **{f'{key}__{lookup}': values[position]}))
+        return reduce(lambda left, right: left | right, conditions)
+
+    def _field(self, key):
+        return self.object_list.model._meta.get_field(key)
+
+    def _get_page(self, object_list, number, paginator):
+        return CursorPage(
+            list(object_list), number, paginator,
+            has_next=number < self.num_pages,
+            has_previous=number > 1,
+        )
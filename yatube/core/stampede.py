@@ -0,0 +1,75 @@
+"""Пересчёт кешированных значений без «стада» запросов.
+
+get_or_recompute() хранит рядом со значением срок его свежести и время,
+за которое оно было посчитано. Когда срок подходит к концу, пересчёт
+начинается заранее с вероятностью, растущей к самому сроку (XFetch,
+probabilistic early expiration): чем дольше считается значение, тем
+раньше. Пересчитывает один запрос — тот, кому досталась короткая
+блокировка cache.add, — а остальные тем временем получают прежнее
+значение: оно хранится в кеше ещё stale секунд после срока свежести.
+Если прежнего значения нет совсем, остальные ждут результат не дольше
+wait секунд, а затем считают сами.
+"""
+import math
+import random
+import time
+
+from django.core.cache import cache
+
+LOCK_TIMEOUT = 10
+WAIT = 1.0
+POLL_INTERVAL = 0.05
+
+
+def _store(key, compute, timeout, stale):
+    started = time.monotonic()
+    value = compute()
+    delta = time.monotonic() - started
+    cache.set(key, (value, delta, time.time() + timeout), timeout + stale)
+    return value
+
+
+def _wait(key, wait):
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def is_fresh(delta, expires, beta=1.0):
+    """Не пора ли ещё пересчитывать значение со сроком expires.
+
+    -log(u) при u из (0, 1] — экспоненциальная случайная величина:
+    обычно небольшая, изредка большая, поэтому досрочный пересчёт
+    достаётся одному из множества запросов.
+    """
+    return time.time() - delta * beta * math.log(1 - random.random()) < expires
+
+
+def get_or_recompute(key, compute, timeout, stale=None, beta=1.0,
+                     lock_timeout=LOCK_TIMEOUT, wait=WAIT):
+    """Значение key из кеша; при промахе или к концу срока — compute().
+
+    stale — сколько секунд после timeout значение ещё можно отдавать,
+    пока его пересчитывают (по умолчанию столько же, сколько timeout).
+    """
+    stale = timeout if stale is None else stale
+    lock = f'{key}:lock'
+    entry = cache.get(key)
+    if entry is not None:
+        value, delta, expires = entry
+        if is_fresh(delta, expires, beta) or not cache.add(
+                lock, 1, lock_timeout):
+            return value
+    elif not cache.add(lock, 1, lock_timeout):
+        entry = _wait(key, wait)
+        if entry is not None:
+            return entry[0]
+        return _store(key, compute, timeout, stale)
+    try:
+        return _store(key, compute, timeout, stale)
+    finally:
+        cache.delete(lock)
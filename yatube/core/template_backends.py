@@ -0,0 +1,35 @@
+import time
+
+from django.template.backends.django import DjangoTemplates, Template
+
+from .middleware import current
+
+
+class TimedTemplate(Template):
+    """Шаблон, добавляющий время отрисовки к замеру текущего запроса.
+
+    Вложенные отрисовки (render_to_string из тегов вроде post_cards)
+    уже входят во время внешней и отдельно не считаются.
+    """
+
+    def render(self, context=None, request=None):
+        stats = current.get()
+        if stats is None or stats.template_depth:
+            return super().render(context, request)
+        stats.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_time += time.perf_counter() - started
+            stats.template_depth -= 1
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    def from_string(self, template_code):
+        return TimedTemplate(
+            super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(
+            super().get_template(template_name).template, self)
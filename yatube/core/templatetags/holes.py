@@ -0,0 +1,64 @@
+from django import template
+from django.template.base import token_kwargs
+from django.utils.safestring import mark_safe
+
+from core import holes
+
+register = template.Library()
+
+
+class HoleNode(template.Node):
+    def __init__(self, name, arguments, nodelist=None):
+        self.name = name
+        self.arguments = arguments
+        self.nodelist = nodelist
+
+    def render(self, context):
+        request = context.get('request')
+        arguments = {
+            key: value.resolve(context)
+            for key, value in self.arguments.items()
+        }
+        if request is not None and holes.deferred(request):
+            return mark_safe(holes.marker(self.name, arguments))
+        if self.nodelist is not None:
+            return self.nodelist.render(context)
+        return mark_safe(holes.render(request, self.name, arguments))
+
+
+def parse_hole(parser, token):
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' принимает имя дырки.")
+    name = bits[1].strip('\'"')
+    remaining = bits[2:]
+    arguments = token_kwargs(remaining, parser)
+    if remaining:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' принимает только аргументы вида ключ=значение.")
+    return name, arguments
+
+
+@register.tag
+def hole(parser, token):
+    """Фрагмент пользователя, который всегда рисует рендерер дырки.
+
+    {% hole 'nav' view_name=view_name %}
+    """
+    return HoleNode(*parse_hole(parser, token))
+
+
+@register.tag
+def holeblock(parser, token):
+    """Дырка, которую без кеша страницы рисует собственное содержимое.
+
+    {% holeblock 'like_bar' post_id=post.id %}…{% endholeblock %}
+
+    Так данные из контекста view (например, аннотации постов) не
+    запрашиваются заново; рендерер нужен только для меток.
+    """
+    name, arguments = parse_hole(parser, token)
+    nodelist = parser.parse(('endholeblock',))
+    parser.delete_first_token()
+    return HoleNode(name, arguments, nodelist)
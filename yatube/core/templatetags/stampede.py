@@ -0,0 +1,50 @@
+from django import template
+from django.core.cache.utils import make_template_fragment_key
+
+from core.stampede import get_or_recompute
+
+register = template.Library()
+
+
+class StampedeCacheNode(template.Node):
+    def __init__(self, nodelist, timeout, fragment_name, vary_on):
+        self.nodelist = nodelist
+        self.timeout = timeout
+        self.fragment_name = fragment_name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        timeout = self.timeout.resolve(context)
+        if not timeout:
+            return self.nodelist.render(context)
+        key = make_template_fragment_key(
+            self.fragment_name,
+            [value.resolve(context) for value in self.vary_on],
+        )
+        return get_or_recompute(
+            key, lambda: self.nodelist.render(context), int(timeout))
+
+
+@register.tag('stampede_cache')
+def do_stampede_cache(parser, token):
+    """Как {% cache %}, но без «стада» при истечении срока.
+
+    {% stampede_cache timeout fragment_name [var ...] %}
+    …
+    {% endstampede_cache %}
+
+    Пока один запрос пересчитывает фрагмент, остальные получают прежний.
+    Пустой timeout (0 или None) отключает кеш фрагмента.
+    """
+    nodelist = parser.parse(('endstampede_cache',))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    if len(tokens) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{tokens[0]}' принимает не меньше двух аргументов.")
+    return StampedeCacheNode(
+        nodelist,
+        parser.compile_filter(tokens[1]),
+        tokens[2],
+        [parser.compile_filter(token) for token in tokens[3:]],
+    )
@@ -0,0 +1,152 @@
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core.cache_backends import LocalCache, Stamps, TieredCache
+
+
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location, ignore_errors=True)
+        self.cache = self.make_cache()
+
+    def make_cache(self, **options):
+        return TieredCache(self.location, {'OPTIONS': options})
+
+    def other_process(self):
+        """Экземпляр со своим LRU: так выглядит кеш другого воркера."""
+        other = self.make_cache()
+        other._local = LocalCache(2 ** 20, 60)
+        return other
+
+    def test_basic_operations(self):
+        """set, add, incr, delete и get_many ведут себя как в Django."""
+        self.cache.set('a', {'n': 1})
+        self.assertEqual(self.cache.get('a'), {'n': 1})
+        self.assertFalse(self.cache.add('a', 2))
+        self.assertTrue(self.cache.add('b', 1))
+        self.assertEqual(self.cache.incr('b', 5), 6)
+        self.cache.set_many({'c': 'x', 'd': None})
+        self.assertEqual(
+            self.cache.get_many(['a', 'c', 'd', 'missing']),
+            {'a': {'n': 1}, 'c': 'x', 'd': None},
+        )
+        self.cache.delete('a')
+        self.assertIsNone(self.cache.get('a'))
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_cached_value_is_copied(self):
+        """Изменение полученного объекта не меняет значение в кеше."""
+        self.cache.set('list', [1])
+        self.cache.get('list').append(2)
+        self.assertEqual(self.cache.get('list'), [1])
+
+    def test_local_hit_skips_file(self):
+        """Повторное чтение ключа обслуживает LRU процесса."""
+        self.cache.set('a', 1)
+        self.cache.get('b')
+        with mock.patch.object(TieredCache, '_fetch') as fetch:
+            self.assertEqual(self.cache.get_many(['a']), {'a': 1})
+        fetch.assert_not_called()
+
+    def test_expired_keys(self):
+        """Истёкший ключ не читается и освобождается для add."""
+        self.cache.set('a', 1, timeout=0.05)
+        time.sleep(0.1)
+        self.assertIsNone(self.cache.get('a'))
+        self.assertTrue(self.cache.add('a', 2))
+        self.assertEqual(self.cache.get('a'), 2)
+
+    def test_local_size_in_bytes(self):
+        """LRU вытесняет давние ключи, когда превышен объём в байтах."""
+        local = LocalCache(max_bytes=250, timeout=60)
+        for key in 'abc':
+            local.put(key, bytes(100), None, (0, 0))
+        local.get('b', (0, 0))
+        local.put('d', bytes(100), None, (0, 0))
+        self.assertEqual(list(local.entries), ['b', 'd'])
+        self.assertEqual(local.size, 200)
+
+    def test_write_invalidates_other_process(self):
+        """Запись в одном процессе видна в другом, хотя тот держит копию."""
+        other = self.other_process()
+        self.cache.set('a', 1)
+        self.assertEqual(other.get('a'), 1)
+        self.cache.set('a', 2)
+        self.assertEqual(other.get('a'), 2)
+        self.cache.incr('a')
+        self.assertEqual(other.get('a'), 3)
+        self.cache.delete('a')
+        self.assertIsNone(other.get('a'))
+
+    def test_clear_invalidates_other_process(self):
+        """clear() сбрасывает LRU всех процессов."""
+        other = self.other_process()
+        self.cache.set_many({'a': 1, 'b': 2})
+        self.assertEqual(other.get_many(['a', 'b']), {'a': 1, 'b': 2})
+        self.cache.clear()
+        self.assertEqual(other.get_many(['a', 'b']), {})
+
+    def test_incr_is_atomic(self):
+        """Параллельные incr из разных экземпляров не теряют приращений."""
+        self.cache.set('counter', 0)
+
+        def work():
+            cache = self.other_process()
+            for _ in range(50):
+                cache.incr('counter')
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.cache.get('counter'), 200)
+
+    def test_interleaved_writers(self):
+        """Чужая запись между COMMIT и штампом не оставляет копию в LRU."""
+        self.cache.set('counter', 1)
+        other = self.other_process()
+        touch = Stamps.touch
+        writers = []
+
+        def slow_touch(stamps, key):
+            # Пока писатель A между COMMIT и штампом, пишет B
+            if not writers:
+                writers.append(threading.Thread(
+                    target=other.incr, args=('counter',)))
+                writers[0].start()
+                writers[0].join(timeout=0.2)
+            return touch(stamps, key)
+
+        with mock.patch.object(Stamps, 'touch', slow_touch):
+            self.assertEqual(self.cache.incr('counter'), 2)
+        writers[0].join()
+        self.assertEqual(self.cache.get('counter'), 3)
+        self.assertEqual(other.get('counter'), 3)
+
+    def test_files_private(self):
+        """Каталог и файлы кеша доступны только владельцу."""
+        location = os.path.join(self.location, 'private')
+        TieredCache(location, {})
+        self.assertEqual(stat.S_IMODE(os.stat(location).st_mode), 0o700)
+        for name in ('cache.sqlite3', 'stamps'):
+            path = os.path.join(location, name)
+            self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+
+    def test_cull(self):
+        """Сверх MAX_ENTRIES давно записанные ключи удаляются."""
+        cache = self.make_cache(MAX_ENTRIES=50, CULL_FREQUENCY=2)
+        for number in range(100):
+            cache.set(f'key{number}', number)
+        rows = cache._db().execute('SELECT COUNT(*) FROM cache').fetchone()
+        self.assertLessEqual(rows[0], 50)
+        self.assertEqual(self.other_process().get('key99'), 99)
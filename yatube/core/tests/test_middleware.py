@@ -0,0 +1,92 @@
+import itertools
+import json
+from unittest import mock
+
+from django.db import connection
+from django.template import engines
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+
+from core import budgets
+from core.middleware import RequestStats, current
+from posts.models import Post, User
+
+
+class InstrumentationMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.post = Post.objects.create(
+            author=User.objects.create(username='author'), text='Пост')
+        cls.DETAIL_URL = reverse('posts:post_detail', args=[cls.post.id])
+
+    def test_server_timing_header(self):
+        """Ответ содержит Server-Timing с БД, шаблонами и общим временем."""
+        response = self.client.get(self.DETAIL_URL)
+        metrics = dict(
+            part.strip().split(';dur=')
+            for part in response['Server-Timing'].split(',')
+        )
+        self.assertEqual(set(metrics), {'db', 'tpl', 'total'})
+        self.assertGreater(float(metrics['tpl']), 0)
+        self.assertLessEqual(float(metrics['db']), float(metrics['total']))
+
+    def test_query_count_matches_executed(self):
+        """X-Query-Count совпадает с числом выполненных запросов."""
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(self.DETAIL_URL)
+        self.assertEqual(int(response['X-Query-Count']), len(captured))
+
+    def test_structured_log(self):
+        """Сводка запроса пишется в лог одной JSON-строкой."""
+        with self.assertLogs('core.middleware', 'INFO') as logs:
+            self.client.get(self.DETAIL_URL)
+        summary = json.loads(logs.records[0].getMessage())
+        self.assertEqual(summary['view'], 'posts:post_detail')
+        self.assertEqual(summary['status'], 200)
+        self.assertGreater(summary['queries'], 0)
+
+    def test_nested_render_counted_once(self):
+        """Отрисовка внутри другой не добавляет своё время повторно."""
+        engine = engines.all()[0]
+        inner = engine.from_string('внутри')
+        outer = engine.from_string('{{ inner }}')
+        stats = RequestStats()
+        token = current.set(stats)
+        # каждый вызов часов — ещё одна секунда
+        clock = itertools.count()
+        try:
+            with mock.patch('time.perf_counter',
+                            lambda: float(next(clock))):
+                outer.render({'inner': inner.render})
+        finally:
+            current.reset(token)
+        self.assertEqual(stats.template_time, 1.0)
+        self.assertEqual(stats.template_depth, 0)
+
+
+class QueryBudgetTests(TestCase):
+    def test_fingerprint_hides_values(self):
+        """Отпечаток запроса не зависит от подставленных значений."""
+        self.assertEqual(
+            budgets.fingerprint("SELECT * FROM t WHERE id = 1 AND s = 'a'"),
+            budgets.fingerprint("SELECT * FROM t WHERE id = 25 AND s = 'b'"),
+        )
+
+    def test_budget_breach_is_logged(self):
+        """Превышение бюджета вне тестового раннера пишется в лог."""
+        post = Post.objects.create(
+            author=User.objects.create(username='author'), text='Пост')
+        view = resolve(reverse('posts:post_detail', args=[post.id])).func
+        strict = budgets.STRICT
+        budgets.STRICT = False
+        try:
+            with mock.patch.object(view, 'query_budget', 0), \
+                    self.assertLogs('core.middleware', 'WARNING') as logs:
+                self.client.get(reverse('posts:post_detail', args=[post.id]))
+        finally:
+            budgets.STRICT = strict
+        summary = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(summary['event'], 'query_budget_exceeded')
+        self.assertTrue(summary['fingerprints'])
@@ -0,0 +1,120 @@
+import re
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from core import holes
+from core.page_cache import PageCacheMiddleware
+from posts import thumbnails
+from posts.models import Comment, Follow, Group, Post, Reaction, User
+
+CSRF_RE = re.compile(r'name="csrfmiddlewaretoken" value="[^"]+"')
+
+
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='author')
+        cls.reader = User.objects.create(username='reader')
+        group = Group.objects.create(title='Группа', slug='group')
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author, group=group, text=f'Пост {number}')
+            for number in range(3)
+        ]
+        Reaction.objects.create(user=cls.reader, post=cls.posts[0])
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.INDEX_URL = reverse('posts:index')
+        cls.PROFILE_URL = reverse('posts:profile', args=[cls.author.username])
+        cls.DETAIL_URL = reverse(
+            'posts:post_detail', args=[cls.posts[0].id])
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.reader)
+        self.guest = self.client_class()
+
+    def uncached(self, url):
+        with mock.patch.object(
+                PageCacheMiddleware, 'process_view', return_value=None):
+            return self.client.get(url)
+
+    def test_guest_page_served_from_cache(self):
+        """Повторный запрос гостя отдаётся из кеша без вызова view."""
+        first = self.guest.get(self.INDEX_URL)
+        second = self.guest.get(self.INDEX_URL)
+        self.assertIn('page_obj', first.context)
+        # контекст второго ответа — только от шаблонов дырок
+        self.assertNotIn('page_obj', second.context)
+        self.assertEqual(first.content, second.content)
+        self.assertNotIn(b'<!--hole:', second.content)
+
+    def test_user_gets_cached_page_with_own_holes(self):
+        """Вошедший получает кешированную гостем страницу со своими дырками."""
+        for url in (self.PROFILE_URL, self.DETAIL_URL, self.INDEX_URL):
+            with self.subTest(url=url):
+                self.guest.get(url)
+                response = self.client.get(url)
+                self.assertNotIn('page_obj', response.context)
+                self.assertContains(response, 'Пользователь:')
+                self.assertContains(response, 'btn btn-sm btn-primary')
+
+    def test_same_body_as_uncached(self):
+        """Страница из кеша совпадает с нарисованной без кеша."""
+        self.guest.get(self.PROFILE_URL)
+        cached = self.client.get(self.PROFILE_URL).content.decode()
+        self.assertIn('Отписаться', cached)
+        self.assertEqual(
+            CSRF_RE.sub('', cached),
+            CSRF_RE.sub('', self.uncached(self.PROFILE_URL).content.decode()),
+        )
+
+    def test_user_miss_not_stored(self):
+        """Страница, нарисованная для вошедшего, в общий кеш не попадает."""
+        self.client.get(self.INDEX_URL)
+        self.assertIn('page_obj', self.guest.get(self.INDEX_URL).context)
+
+    def test_holes_filled_in_batches(self):
+        """Лайки всех постов страницы — один запрос на всю страницу."""
+        self.guest.get(self.INDEX_URL)
+        # сессия и пользователь после первого запроса читаются из кеша
+        self.client.get(self.PROFILE_URL)
+        with self.assertNumQueries(1):
+            self.client.get(self.INDEX_URL)
+
+    def test_invalidated_by_versions(self):
+        """Правка поста и новый комментарий сбрасывают страницы."""
+        self.guest.get(self.INDEX_URL)
+        self.guest.get(self.DETAIL_URL)
+        post = self.posts[0]
+        post.text = 'Новый текст'
+        post.save()
+        self.assertContains(self.guest.get(self.INDEX_URL), 'Новый текст')
+        self.guest.get(self.DETAIL_URL)
+        Comment.objects.create(post=post, author=self.reader, text='Ответ')
+        self.assertContains(self.guest.get(self.DETAIL_URL), 'Ответ')
+
+    def test_detail_keeps_cache_on_other_posts(self):
+        """Страницу поста сбрасывают его записи, а не записи чужих постов."""
+        other = Post.objects.create(author=self.reader, text='Чужой пост')
+        self.guest.get(self.DETAIL_URL)
+        self.guest.get(self.DETAIL_URL)
+        thumbnails.mark_ready(other)
+        self.assertNotIn(
+            'comments', self.guest.get(self.DETAIL_URL).context)
+        post = self.posts[0]
+        post.text = 'Новый текст'
+        post.save()
+        self.assertContains(self.guest.get(self.DETAIL_URL), 'Новый текст')
+
+    def test_marker_round_trip(self):
+        """Аргументы дырки переживают HTML-комментарий, даже с «--»."""
+        holes.register('echo', lambda request, items: [
+            item['text'] for item in items])
+        self.addCleanup(holes.RENDERERS.pop, 'echo')
+        marker = holes.marker('echo', {'text': 'a--b'})
+        self.assertNotIn('--', marker[4:-3])
+        self.assertEqual(holes.fill(None, f'<p>{marker}</p>'), '<p>a--b</p>')
@@ -0,0 +1,96 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import TestCase
+from django.urls import reverse
+
+from core import stampede
+from core.page_cache import PageCacheMiddleware
+from posts.models import Post, User
+
+
+class GetOrRecomputeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.compute = mock.Mock(return_value='новое')
+
+    def store(self, value, expires_in, delta=0.01):
+        cache.set('key', (value, delta, time.time() + expires_in), 60)
+
+    def test_miss_computes_once(self):
+        """Промах считает значение, следующее обращение берёт его из кеша."""
+        for _ in range(2):
+            self.assertEqual(
+                stampede.get_or_recompute('key', self.compute, 20), 'новое')
+        self.compute.assert_called_once()
+
+    def test_stale_value_while_locked(self):
+        """Пока другой запрос пересчитывает, отдаётся прежнее значение."""
+        self.store('старое', expires_in=-1)
+        cache.add('key:lock', 1)
+        self.assertEqual(
+            stampede.get_or_recompute('key', self.compute, 20), 'старое')
+        self.compute.assert_not_called()
+
+    def test_expired_value_recomputed_and_unlocked(self):
+        """Истёкшее значение пересчитывает тот, кто взял блокировку."""
+        self.store('старое', expires_in=-1)
+        self.assertEqual(
+            stampede.get_or_recompute('key', self.compute, 20), 'новое')
+        self.assertIsNone(cache.get('key:lock'))
+
+    def test_early_recompute(self):
+        """К концу срока значение пересчитывается заранее."""
+        self.store('старое', expires_in=1, delta=0.5)
+        with mock.patch('random.random', return_value=0.0):
+            self.assertEqual(
+                stampede.get_or_recompute('key', self.compute, 20), 'старое')
+        with mock.patch('random.random', return_value=0.99):
+            self.assertEqual(
+                stampede.get_or_recompute('key', self.compute, 20), 'новое')
+
+    def test_no_value_waits_then_computes(self):
+        """Без прежнего значения ждём не дольше wait и считаем сами."""
+        cache.add('key:lock', 1)
+        self.assertEqual(
+            stampede.get_or_recompute('key', self.compute, 20, wait=0.1),
+            'новое')
+
+
+class StampedeCacheTagTests(TestCase):
+    TEMPLATE = Template(
+        '{% load stampede %}'
+        '{% stampede_cache timeout fragment name %}{{ value }}'
+        '{% endstampede_cache %}'
+    )
+
+    def setUp(self):
+        cache.clear()
+
+    def render(self, **context):
+        return self.TEMPLATE.render(Context({'name': 'a', **context}))
+
+    def test_fragment_cached(self):
+        """Фрагмент кешируется с учётом переменных ключа."""
+        self.assertEqual(self.render(timeout=20, value=1), '1')
+        self.assertEqual(self.render(timeout=20, value=2), '1')
+        self.assertEqual(self.render(timeout=20, value=2, name='b'), '2')
+
+    def test_empty_timeout_disables_cache(self):
+        """Пустой timeout отключает кеш фрагмента."""
+        self.render(timeout=None, value=1)
+        self.assertEqual(self.render(timeout=20, value=2), '2')
+
+    def test_index_feed_served_from_fragment(self):
+        """Гость получает ленту главной из фрагмента без запроса постов."""
+        Post.objects.create(
+            author=User.objects.create(username='author'), text='Пост')
+        url = reverse('posts:index')
+        # Без кеша целых страниц: проверяем сам фрагмент
+        with mock.patch.object(
+                PageCacheMiddleware, 'process_view', return_value=None):
+            self.client.get(url)
+            with self.assertNumQueries(0):
+                self.assertContains(self.client.get(url), 'Пост')
@@ -0,0 +1,50 @@
+"""Реестр версий для инвалидации кеша.
+
+Версия пространства имён (например, «posts» или «group:3») входит
+в ключ кешированного фрагмента. При записи версия увеличивается,
+и все фрагменты со старыми ключами перестают использоваться сразу,
+без перебора и удаления ключей.
+"""
+import time
+
+from django.core.cache import cache
+
+KEY_PREFIX = 'version'
+
+
+def _key(namespace):
+    return f'{KEY_PREFIX}:{namespace}'
+
+
+def _initial():
+    # Начальная версия растёт со временем: если ключ версии вытеснят
+    # из кеша, новая версия не совпадёт с давно сохранёнными фрагментами.
+    return int(time.time() * 1000)
+
+
+def get_versions(*namespaces):
+    """Словарь версий пространств имён за одно обращение к кешу."""
+    keys = {_key(namespace): namespace for namespace in namespaces}
+    found = cache.get_many(keys)
+    versions = {}
+    for key, namespace in keys.items():
+        if key not in found:
+            cache.add(key, _initial(), timeout=None)
+            found[key] = cache.get(key, _initial())
+        versions[namespace] = found[key]
+    return versions
+
+
+def get_version(*namespaces):
+    """Общая версия нескольких пространств имён для ключа фрагмента."""
+    versions = get_versions(*namespaces)
+    return '.'.join(str(versions[namespace]) for namespace in namespaces)
+
+
+def bump(*namespaces):
+    """Увеличивает версии — связанные фрагменты становятся недействительны."""
+    for namespace in namespaces:
+        try:
+            cache.incr(_key(namespace))
+        except ValueError:
+            cache.set(_key(namespace), _initial(), timeout=None)
@@ -0,0 +1,257 @@
+"""Сквозной бенчмарк страниц постов на данных реального объёма.
+
+seed() наполняет базу пользователями, группами, степенным (power-law)
+графом подписок, постами и комментариями в обход сигналов — так же,
+как import_posts, — а затем пересчитывает производные данные.
+run() прогоняет страницы через тестовый клиент и собирает
+перцентили времени ответа и число SQL-запросов; compare() сравнивает
+их с сохранённым эталоном. Кеш на время замера — отдельный, см.
+isolated_cache().
+"""
+import heapq
+import random
+import tempfile
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from yatube.settings import TIMELINE_BACKFILL_POSTS
+
+from . import counters, search
+from .models import (AuthorStats, Comment, Follow, Group, Post,
+                     TimelineEntry, User)
+from .utils import bulk_create_posts
+
+BATCH_SIZE = 5000
+
+# Ленты читателей наполняются не целиком, а как после подписки —
+# до TIMELINE_BACKFILL_POSTS записей, поэтому large укладывается
+# в 50 тыс. × 200 строк TimelineEntry (см. seed_timelines)
+SIZES = {
+    'small': {'posts': 10_000, 'users': 1_000, 'groups': 20},
+    'large': {'posts': 1_000_000, 'users': 50_000, 'groups': 200},
+}
+
+WORDS = (
+    'лето море город книга поезд утро кофе вечер друг дорога дом '
+    'музыка снег окно работа парк река солнце ветер письмо'
+).split()
+
+
+def _batches(items, size=BATCH_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _text(rng):
+    return ' '.join(rng.choices(WORDS, k=rng.randint(5, 40))).capitalize()
+
+
+def seed(posts, users, groups, follows=20, comments=None, alpha=1.1,
+         random_seed=0):
+    """Наполняет пустую базу данными заданного объёма.
+
+    Популярность авторов распределена по закону Ципфа с показателем
+    alpha: на первых авторов подписана и пишет большая часть людей.
+    """
+    rng = random.Random(random_seed)
+    User.objects.bulk_create(
+        (User(username=f'bench{number}', password='!')
+         for number in range(users)),
+    )
+    user_ids = list(User.objects.order_by('id').values_list('id', flat=True))
+    Group.objects.bulk_create(
+        Group(title=f'Группа {number}', slug=f'group-{number}',
+              description=_text(rng))
+        for number in range(groups)
+    )
+    group_ids = list(Group.objects.values_list('id', flat=True))
+    weights = [1 / (rank + 1) ** alpha for rank in range(len(user_ids))]
+
+    with transaction.atomic():
+        Follow.objects.bulk_create(
+            (
+                Follow(user_id=user_id, author_id=author_id)
+                for user_id in user_ids
+                for author_id in set(rng.choices(
+                    user_ids, weights, k=follows)) - {user_id}
+            ),
+            ignore_conflicts=True,
+        )
+    authors = rng.choices(user_ids, weights, k=posts)
+    for batch in _batches(authors):
+        with transaction.atomic():
+            created = bulk_create_posts([
+                Post(text=_text(rng), author_id=author_id,
+                     group_id=rng.choice(group_ids) if group_ids else None)
+                for author_id in batch
+            ])
+            search.index_posts(created)
+    seed_timelines()
+
+    post_ids = list(Post.objects.values_list('id', flat=True))
+    post_weights = [1 / (rank + 1) ** alpha for rank in range(len(post_ids))]
+    commented = rng.choices(
+        post_ids[::-1], post_weights,
+        k=posts // 10 if comments is None else comments)
+    for batch in _batches(commented):
+        Comment.objects.bulk_create(
+            Comment(post_id=post_id, author_id=rng.choice(user_ids),
+                    text=_text(rng))
+            for post_id in batch
+        )
+    with transaction.atomic():
+        counters.recount()
+
+
+def seed_timelines(limit=TIMELINE_BACKFILL_POSTS):
+    """Ленты читателей: не больше limit последних постов их подписок.
+
+    Полная раскладка на степенном графе — это посты автора на каждого
+    его подписчика: для large порядка 10^10 строк. Живая лента после
+    подписки получает столько же последних постов (timeline.backfill),
+    а более старые записи страница подписок почти не читает.
+    """
+    latest = {}
+    for post_id, author_id, pub_date in Post.objects.order_by(
+            '-pub_date', '-id').values_list(
+            'id', 'author_id', 'pub_date').iterator():
+        posts = latest.setdefault(author_id, [])
+        if len(posts) < limit:
+            posts.append((pub_date, post_id, author_id))
+    following = {}
+    for user_id, author_id in Follow.objects.values_list(
+            'user_id', 'author_id').iterator():
+        following.setdefault(user_id, []).append(latest.get(author_id, ()))
+    with transaction.atomic():
+        TimelineEntry.objects.bulk_create(
+            (
+                TimelineEntry(user_id=user_id, post_id=post_id,
+                              author_id=author_id, pub_date=pub_date)
+                for user_id, feeds in following.items()
+                for pub_date, post_id, author_id in islice(
+                    heapq.merge(*feeds, reverse=True), limit)
+            ),
+        )
+
+
+def targets(random_seed=0):
+    """Адреса страниц для замера: самые тяжёлые группа, автор и лента."""
+    rng = random.Random(random_seed)
+    group = Group.objects.order_by('-posts_count').first()
+    author = AuthorStats.objects.order_by('-posts_count').select_related(
+        'user').first().user
+    reader = AuthorStats.objects.order_by('-following_count').select_related(
+        'user').first().user
+    last_id = Post.objects.aggregate(last=Max('id'))['last']
+    commented = list(Post.objects.order_by('-comments_count').values_list(
+        'id', flat=True)[:50])
+    return reader, {
+        'index': lambda number: reverse('posts:index'),
+        'index_page_50': lambda number: f'{reverse("posts:index")}?page=50',
+        'group_list': lambda number: reverse(
+            'posts:group_list', args=[group.slug]),
+        'profile': lambda number: reverse(
+            'posts:profile', args=[author.username]),
+        'post_detail': lambda number: reverse(
+            'posts:post_detail',
+            args=[commented[number % len(commented)] if number % 2
+                  else rng.randint(1, last_id)]),
+        'follow_index': lambda number: reverse('posts:follow_index'),
+    }
+
+
+def percentile(values, percent):
+    """Перцентиль с линейной интерполяцией между соседними значениями.
+
+    То же, что statistics.quantiles(method='inclusive'), которого нет
+    в Python 3.7.
+    """
+    values = sorted(values)
+    position = (len(values) - 1) * percent / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (
+        values[upper] - values[lower]) * (position - lower)
+
+
+def summarize(latencies, queries):
+    return {
+        'p50': round(percentile(latencies, 50), 2),
+        'p95': round(percentile(latencies, 95), 2),
+        'p99': round(percentile(latencies, 99), 2),
+        'queries': max(queries),
+    }
+
+
+@contextmanager
+def isolated_cache():
+    """Кеш того же вида, что в настройках, но во временном каталоге.
+
+    run() чистит кеш перед запросами: общий кеш воркеров на том же
+    сервере трогать нельзя.
+    """
+    with tempfile.TemporaryDirectory() as location:
+        with override_settings(CACHES={
+            'default': {**settings.CACHES['default'], 'LOCATION': location},
+        }):
+            yield
+
+
+def run(requests=30, warm=False, random_seed=0):
+    """Замеряет страницы; кеш чистится перед каждым запросом, если не warm.
+
+    Вызывается внутри isolated_cache().
+
+    Возвращает {страница: {p50, p95, p99 (мс), queries}}.
+    """
+    reader, urls = targets(random_seed)
+    client = Client()
+    client.force_login(reader)
+    results = {}
+    for name, url in urls.items():
+        client.get(url(0))
+        latencies, queries = [], []
+        for number in range(max(requests, 2)):
+            if not warm:
+                cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(url(number))
+                latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise AssertionError(
+                    f'{name}: ответ {response.status_code}')
+            queries.append(len(captured))
+        results[name] = summarize(latencies, queries)
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """Список регрессий относительно эталона baseline.
+
+    Регрессия — больше SQL-запросов, чем в эталоне, или p95 медленнее
+    эталонного больше чем на долю tolerance.
+    """
+    regressions = []
+    for name, expected in baseline.items():
+        actual = results.get(name)
+        if actual is None:
+            continue
+        if actual['queries'] > expected['queries']:
+            regressions.append(
+                f'{name}: запросов {actual["queries"]} '
+                f'вместо {expected["queries"]}')
+        if actual['p95'] > expected['p95'] * (1 + tolerance):
+            regressions.append(
+                f'{name}: p95 {actual["p95"]} мс '
+                f'вместо {expected["p95"]} мс')
+    return regressions
@@ -0,0 +1,160 @@
+"""Денормализованные счётчики постов, комментариев и подписок.
+
+Счётчики меняются атомарными UPDATE ... SET n = n + 1 из сигналов
+создания и удаления объектов, а recount() пересчитывает их целиком
+и исправляет накопившееся расхождение.
+"""
+from django.db.models import Count, F, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce, Mod
+
+from yatube.settings import REACTION_COUNTER_SHARDS
+
+from .models import (AuthorStats, Comment, Follow, Group, Post, Reaction,
+                     ReactionCounter, User)
+
+BATCH_SIZE = 500
+
+# (модель со счётчиком, поле счётчика, считаемая модель, поле связи)
+COUNTERS = (
+    (Post, 'comments_count', Comment, 'post'),
+    (Group, 'posts_count', Post, 'group'),
+    (AuthorStats, 'posts_count', Post, 'author'),
+    (AuthorStats, 'followers_count', Follow, 'author'),
+    (AuthorStats, 'following_count', Follow, 'user'),
+)
+
+
+def add(model, pk, field, delta):
+    """Атомарно изменяет счётчик field записи pk на delta."""
+    if pk is None:
+        return
+    model.objects.filter(pk=pk).update(**{field: F(field) + delta})
+
+
+def ensure_stats(user_id):
+    AuthorStats.objects.get_or_create(user_id=user_id)
+
+
+def post_added(post):
+    add(AuthorStats, post.author_id, 'posts_count', 1)
+    add(Group, post.group_id, 'posts_count', 1)
+
+
+def posts_imported(posts):
+    """Учитывает посты, вставленные bulk_create в обход сигналов."""
+    for model, relation in ((AuthorStats, 'author_id'), (Group, 'group_id')):
+        totals = {}
+        for post in posts:
+            pk = getattr(post, relation)
+            totals[pk] = totals.get(pk, 0) + 1
+        for pk, delta in totals.items():
+            add(model, pk, 'posts_count', delta)
+
+
+def post_removed(post):
+    add(AuthorStats, post.author_id, 'posts_count', -1)
+    add(Group, post.group_id, 'posts_count', -1)
+
+
+def post_regrouped(old_group_id, new_group_id):
+    add(Group, old_group_id, 'posts_count', -1)
+    add(Group, new_group_id, 'posts_count', 1)
+
+
+def comment_added(comment):
+    add(Post, comment.post_id, 'comments_count', 1)
+
+
+def comment_removed(comment):
+    add(Post, comment.post_id, 'comments_count', -1)
+
+
+def follow_added(follow):
+    add(AuthorStats, follow.author_id, 'followers_count', 1)
+    add(AuthorStats, follow.user_id, 'following_count', 1)
+
+
+def follow_removed(follow):
+    add(AuthorStats, follow.author_id, 'followers_count', -1)
+    add(AuthorStats, follow.user_id, 'following_count', -1)
+
+
+def reaction_added(reaction):
+    shard = reaction.user_id % REACTION_COUNTER_SHARDS
+    counter = ReactionCounter.objects.filter(
+        post_id=reaction.post_id, shard=shard)
+    if not counter.update(count=F('count') + 1):
+        ReactionCounter.objects.bulk_create(
+            [ReactionCounter(post_id=reaction.post_id, shard=shard)],
+            ignore_conflicts=True,
+        )
+        counter.update(count=F('count') + 1)
+
+
+def reaction_removed(reaction):
+    # Строку шарда не создаём: при каскадном удалении поста её уже нет
+    ReactionCounter.objects.filter(
+        post_id=reaction.post_id,
+        shard=reaction.user_id % REACTION_COUNTER_SHARDS,
+    ).update(count=F('count') - 1)
+
+
+def recount_reactions():
+    """Пересобирает шарды постов, у которых сумма разошлась с реакциями."""
+    actual = dict(Reaction.objects.order_by().values('post').annotate(
+        total=Count('pk')).values_list('post', 'total'))
+    stored = dict(ReactionCounter.objects.order_by().values('post').annotate(
+        total=Sum('count')).values_list('post', 'total'))
+    drifted = [
+        post_id for post_id in {*actual, *stored}
+        if actual.get(post_id, 0) != stored.get(post_id, 0)
+    ]
+    for start in range(0, len(drifted), BATCH_SIZE):
+        batch = drifted[start:start + BATCH_SIZE]
+        ReactionCounter.objects.filter(post_id__in=batch).delete()
+        ReactionCounter.objects.bulk_create(
+            ReactionCounter(post_id=post_id, shard=shard, count=total)
+            for post_id, shard, total in Reaction.objects.filter(
+                post_id__in=batch
+            ).order_by().annotate(
+                shard=Mod('user_id', REACTION_COUNTER_SHARDS)
+            ).values('post', 'shard').annotate(
+                total=Count('pk')
+            ).values_list('post', 'shard', 'total')
+        )
+    return len(drifted)
+
+
+def _actual(counted, relation):
+    return Coalesce(Subquery(
+        counted.objects.filter(**{relation: OuterRef('pk')})
+        .order_by()
+        .values(relation)
+        .annotate(total=Count('pk'))
+        .values('total')
+    ), 0)
+
+
+def recount():
+    """Пересчитывает все счётчики; возвращает число исправленных строк."""
+    AuthorStats.objects.bulk_create(
+        (
+            AuthorStats(user_id=user_id)
+            for user_id in User.objects.filter(
+                stats__isnull=True).values_list('pk', flat=True)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    repaired = {}
+    for model, field, counted, relation in COUNTERS:
+        actual = _actual(counted, relation)
+        drifted = list(model.objects.annotate(actual=actual).exclude(
+            **{field: F('actual')}
+        ).values_list('pk', flat=True))
+        for start in range(0, len(drifted), BATCH_SIZE):
+            model.objects.filter(
+                pk__in=drifted[start:start + BATCH_SIZE]
+            ).update(**{field: actual})
+        repaired[f'{model.__name__}.{field}'] = len(drifted)
+    repaired['ReactionCounter.count'] = recount_reactions()
+    return repaired
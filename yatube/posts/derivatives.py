@@ -0,0 +1,97 @@
+"""Адаптивные копии картинок постов для <img srcset>.
+
+Для каждой ширины из DERIVATIVE_WIDTHS и каждого формата из
+DERIVATIVE_FORMATS строится кадрированная копия без метаданных
+(EXIF, ICC, комментарии), и она записывается в ImageDerivative.
+Копии строит тот же обработчик очереди, что и миниатюры.
+"""
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps
+
+from yatube.settings import (DERIVATIVE_ASPECT, DERIVATIVE_FORMATS,
+                             DERIVATIVE_QUALITY, DERIVATIVE_WIDTHS)
+
+from .models import ImageDerivative
+
+MIME_TYPES = {
+    'avif': 'image/avif',
+    'jpeg': 'image/jpeg',
+    'webp': 'image/webp',
+}
+EXTENSIONS = {'jpeg': 'jpg'}
+
+
+def _height(width):
+    aspect_width, aspect_height = DERIVATIVE_ASPECT
+    return round(width * aspect_height / aspect_width)
+
+
+def _encode(image, image_format):
+    buffer = BytesIO()
+    # Метаданные не передаём, поэтому в файл они не попадают
+    image.save(buffer, image_format.upper(), quality=DERIVATIVE_QUALITY,
+               optimize=True)
+    return buffer.getvalue()
+
+
+def build(post):
+    """Строит все копии картинки поста, заменяя прежние."""
+    with post.image.open('rb'), Image.open(post.image) as source:
+        source = ImageOps.exif_transpose(source).convert('RGB')
+        files = [
+            (width, image_format, _encode(ImageOps.fit(
+                source, (width, _height(width)), Image.LANCZOS
+            ), image_format))
+            for width in DERIVATIVE_WIDTHS
+            for image_format in DERIVATIVE_FORMATS
+        ]
+    with transaction.atomic():
+        remove(post)
+        for width, image_format, content in files:
+            derivative = ImageDerivative(
+                post=post, width=width, format=image_format,
+                size=len(content))
+            extension = EXTENSIONS.get(image_format, image_format)
+            derivative.image.save(
+                f'{post.pk}-{width}.{extension}',
+                ContentFile(content),
+                save=False
+            )
+            derivative.save()
+
+
+def remove(post):
+    for derivative in post.derivatives.all():
+        derivative.image.delete(save=False)
+        derivative.delete()
+
+
+def srcset(derivatives, image_format):
+    return ', '.join(
+        f'{derivative.image.url} {derivative.width}w'
+        for derivative in derivatives if derivative.format == image_format
+    )
+
+
+def picture(post):
+    """Данные для <picture>: источники по форматам и запасной <img>."""
+    derivatives = list(post.derivatives.all())
+    if not derivatives:
+        return None
+    *source_formats, fallback = DERIVATIVE_FORMATS
+    fallback_images = [d for d in derivatives if d.format == fallback]
+    return {
+        'sources': [
+            {'type': MIME_TYPES[image_format],
+             'srcset': srcset(derivatives, image_format)}
+            for image_format in source_formats
+        ],
+        'srcset': srcset(derivatives, fallback),
+        'src': min(
+            fallback_images,
+            key=lambda d: abs(d.width - DERIVATIVE_ASPECT[0])
+        ).image.url if fallback_images else '',
+    }
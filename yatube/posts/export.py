@@ -0,0 +1,72 @@
+"""Потоковая выгрузка постов, комментариев и подписок в NDJSON.
+
+Строки читаются через values_list(...).iterator(chunk_size), поэтому
+память не растёт с размером таблиц; сжатие gzip тоже идёт потоком.
+"""
+import datetime as dt
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import is_naive, make_aware
+
+from .models import Comment, Follow, Post
+
+CHUNK_SIZE = 2000
+
+# поток: (модель, поля, поле даты для --since)
+STREAMS = {
+    'posts': (
+        Post,
+        ('id', 'text', 'pub_date', 'author_id', 'group_id', 'image'),
+        'pub_date',
+    ),
+    'comments': (
+        Comment,
+        ('id', 'post_id', 'author_id', 'text', 'created'),
+        'created',
+    ),
+    'follows': (Follow, ('id', 'user_id', 'author_id'), None),
+}
+
+
+def parse_since(value):
+    """Дата или дата-время начала инкрементальной выгрузки."""
+    since = parse_datetime(value)
+    if since is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Некорректная дата: {value}')
+        since = dt.datetime.combine(day, dt.time.min)
+    return make_aware(since) if is_naive(since) else since
+
+
+def rows(stream, since=None, chunk_size=CHUNK_SIZE):
+    model, fields, date_field = STREAMS[stream]
+    queryset = model.objects.order_by(*filter(None, (date_field, 'id')))
+    if since is not None and date_field:
+        queryset = queryset.filter(**{f'{date_field}__gt': since})
+    for values in queryset.values_list(*fields).iterator(chunk_size):
+        yield dict(zip(fields, values))
+
+
+def ndjson(records):
+    for record in records:
+        yield (json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False)
+               + '\n').encode()
+
+
+def gzipped(chunks):
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export(stream, since=None, compress=False):
+    """Итератор байтов NDJSON (или gzip NDJSON) для потока stream."""
+    chunks = ndjson(rows(stream, since))
+    return gzipped(chunks) if compress else chunks
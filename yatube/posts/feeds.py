@@ -0,0 +1,168 @@
+"""RSS и Atom ленты главной страницы, групп и авторов.
+
+Перед отрисовкой одним запросом с индексным подзапросом
+«последний pub_date» вычисляется ETag: если у читателя свежая копия,
+он сразу получает 304. Last-Modified не отдаётся: правка старого поста
+меняет ленту, но не дату последнего, и по If-Modified-Since читатель
+остался бы со старой копией. Готовое тело ленты хранится в кеше под
+версией данных и хостом (ссылки в ленте абсолютные), так что
+пересобирается оно только после новой записи.
+"""
+import hashlib
+
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.db.models import OuterRef, Subquery
+from django.http import Http404, HttpResponse
+from django.urls import reverse, reverse_lazy
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import quote_etag
+from django.utils.text import Truncator
+
+from core import versions
+from yatube.settings import FEED_CACHE_TIMEOUT, FEED_ITEMS
+
+from . import lookups
+from .models import Group, Post, User
+
+
+def newest(**lookup):
+    """Подзапрос «дата последнего поста» — поиск по индексу с LIMIT 1."""
+    return Subquery(
+        Post.objects.filter(**lookup).order_by('-pub_date')
+        .values('pub_date')[:1]
+    )
+
+
+class LatestPostsFeed(Feed):
+    title = 'Yatube: последние записи'
+    link = reverse_lazy('posts:index')
+    description = 'Новые посты всех авторов'
+
+    def freshness(self, **kwargs):
+        """Пространства имён версий и дата последнего поста ленты."""
+        last = Post.objects.order_by('-pub_date').values_list(
+            'pub_date', flat=True).first()
+        return ('posts',), last
+
+    def posts(self, obj):
+        return Post.objects.all()
+
+    def items(self, obj):
+        return self.posts(obj).select_related(
+            'author', 'group')[:FEED_ITEMS]
+
+    def item_title(self, item):
+        return Truncator(item.text).words(10)
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', args=[item.id])
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.modified
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_categories(self, item):
+        return [item.group.title] if item.group else []
+
+
+class GroupPostsFeed(LatestPostsFeed):
+    def freshness(self, slug):
+        found = Group.objects.filter(slug=slug).annotate(
+            last=newest(group=OuterRef('pk'))).values_list('id', 'last')
+        if not found:
+            raise Http404
+        group_id, last = found[0]
+        return (f'group:{group_id}', 'users'), last
+
+    def get_object(self, request, slug):
+        return lookups.get(Group, slug)
+
+    def title(self, obj):
+        return f'Yatube: {obj.title}'
+
+    def link(self, obj):
+        return reverse('posts:group_list', args=[obj.slug])
+
+    def description(self, obj):
+        return obj.description
+
+    def posts(self, obj):
+        return obj.posts.all()
+
+
+class AuthorPostsFeed(LatestPostsFeed):
+    def freshness(self, username):
+        found = User.objects.filter(username=username).annotate(
+            last=newest(author=OuterRef('pk'))).values_list('id', 'last')
+        if not found:
+            raise Http404
+        author_id, last = found[0]
+        return (f'author:{author_id}', 'groups'), last
+
+    def get_object(self, request, username):
+        return lookups.get(User, username)
+
+    def title(self, obj):
+        return f'Yatube: записи {obj.get_full_name() or obj.username}'
+
+    def link(self, obj):
+        return reverse('posts:profile', args=[obj.username])
+
+    def description(self, obj):
+        return f'Новые посты автора {obj.username}'
+
+    def posts(self, obj):
+        return obj.posts.all()
+
+
+class AtomMixin:
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self._get_dynamic_attr('description', obj)
+
+
+class LatestPostsAtomFeed(AtomMixin, LatestPostsFeed):
+    pass
+
+
+class GroupPostsAtomFeed(AtomMixin, GroupPostsFeed):
+    pass
+
+
+class AuthorPostsAtomFeed(AtomMixin, AuthorPostsFeed):
+    pass
+
+
+def cached_feed(feed_class):
+    """View ленты с условным GET и кешированием готового тела."""
+    feed = feed_class()
+    content_type = feed.feed_type.content_type
+
+    def view(request, **kwargs):
+        namespaces, last = feed.freshness(**kwargs)
+        version = versions.get_version(*namespaces)
+        location = f'{request.get_host()}{request.path}'
+        etag = quote_etag(hashlib.md5(
+            f'{location}:{last}:{version}'.encode()).hexdigest())
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            key = f'feed:{feed_class.__name__}:{location}:{version}'
+            content = cache.get(key)
+            if content is None:
+                content = feed(request, **kwargs).content
+                cache.set(key, content, FEED_CACHE_TIMEOUT)
+            response = HttpResponse(content, content_type=content_type)
+        response['ETag'] = etag
+        return response
+    return view
@@ -0,0 +1,79 @@
+"""Рендереры дырок страниц постов (см. core.holes).
+
+Каждый рисует все дырки своего имени на странице разом: данные
+пользователя для них — один запрос на страницу.
+"""
+from django.template.loader import get_template
+
+from core import holes
+
+from . import reactions, view_counts
+from .forms import CommentForm
+from .models import Follow, Post
+
+
+def like_bars(request, items):
+    posts = reactions.with_reactions(
+        Post.objects.filter(
+            pk__in=[item['post_id'] for item in items]
+        ).order_by().only('id'),
+        request.user,
+    ).in_bulk()
+    template = get_template('includes/like_bar.html')
+    return [
+        template.render({'post': posts[item['post_id']]}, request)
+        if item['post_id'] in posts else ''
+        for item in items
+    ]
+
+
+def follow_buttons(request, items):
+    following = set()
+    if request.user.is_authenticated:
+        following = set(Follow.objects.filter(
+            user=request.user,
+            author_id__in=[item['author_id'] for item in items],
+        ).values_list('author_id', flat=True))
+    template = get_template('includes/follow_button.html')
+    return [
+        template.render({
+            'username': item['username'],
+            'following': item['author_id'] in following,
+        }, request)
+        for item in items
+    ]
+
+
+def comment_forms(request, items):
+    template = get_template('includes/comment_form.html')
+    return [
+        template.render({'post_id': item['post_id'], 'form': CommentForm()},
+                        request)
+        for item in items
+    ]
+
+
+def views_counts(request, items):
+    """Просмотры с текущим; сам просмотр учитывается здесь же.
+
+    Рендерер вызывается и при попадании страницы в кеш, когда view
+    не работает, поэтому просмотр кешируемой страницы считает он.
+    """
+    post_ids = [item['post_id'] for item in items]
+    for post_id in post_ids:
+        view_counts.buffer.add(post_id)
+    stored = dict(Post.objects.filter(pk__in=post_ids).order_by(
+    ).values_list('id', 'views_count'))
+    return [
+        str(stored.get(post_id, 0) + view_counts.buffer.pending(post_id))
+        for post_id in post_ids
+    ]
+
+
+holes.register('like_bar', like_bars)
+holes.register('follow_button', follow_buttons)
+holes.register('comment_form', comment_forms)
+holes.register('views_count', views_counts)
+holes.register('switcher', holes.template_renderer('includes/switcher.html'))
+holes.register(
+    'post_edit', holes.template_renderer('includes/post_edit_link.html'))
@@ -0,0 +1,95 @@
+"""Поиск групп по slug и авторов по username через кеш.
+
+Эти строки почти не меняются, а ищут их на каждой странице группы
+и профиля. Найденный объект хранится в кеше вместе с версией
+group:<id> или author:<id> и действителен, пока версия та же: её
+меняют сохранение объекта и запись его постов, в том числе счётчиков
+вроде Group.posts_count. Отсутствие объекта тоже кешируется
+(на NEGATIVE_TIMEOUT), чтобы перебор несуществующих профилей не ходил
+в БД; сигналы сохранения и удаления стирают запись по текущему
+значению поля.
+
+Отдельно кешируется автор поста по его id: автор у поста не меняется,
+а ключ страницы поста зависит от версии author:<id>.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.http import Http404
+from django.shortcuts import get_object_or_404 as default_get_object_or_404
+
+from core import versions
+from yatube.settings import LOOKUP_CACHE_TIMEOUT, LOOKUP_NEGATIVE_TIMEOUT
+
+from .models import Group, User
+
+# модель: (поле поиска, пространство версий объекта)
+LOOKUPS = {
+    Group: ('slug', 'group'),
+    User: ('username', 'author'),
+}
+
+MISSING = 'missing'
+
+
+def lookup_key(model, value):
+    # значение из URL может содержать что угодно, ключ — нет
+    digest = hashlib.md5(str(value).encode()).hexdigest()
+    return f'lookup:{model._meta.label_lower}:{digest}'
+
+
+def _namespace(model, pk):
+    return f'{LOOKUPS[model][1]}:{pk}'
+
+
+def get(model, value):
+    """Объект model с полем поиска, равным value, или None."""
+    field, _ = LOOKUPS[model]
+    key = lookup_key(model, value)
+    cached = cache.get(key)
+    if cached == MISSING:
+        return None
+    if cached is not None:
+        obj, version = cached
+        if versions.get_version(_namespace(model, obj.pk)) == version:
+            return obj
+    obj = model._default_manager.filter(**{field: value}).first()
+    if obj is None:
+        cache.set(key, MISSING, LOOKUP_NEGATIVE_TIMEOUT)
+        return None
+    version = versions.get_version(_namespace(model, obj.pk))
+    cache.set(key, (obj, version), LOOKUP_CACHE_TIMEOUT)
+    return obj
+
+
+def get_object_or_404(klass, **lookup):
+    """Замена django.shortcuts.get_object_or_404 для поиска из LOOKUPS.
+
+    Остальные запросы передаются стандартной функции без изменений.
+    """
+    field, _ = LOOKUPS.get(klass, (None, None))
+    if list(lookup) != [field]:
+        return default_get_object_or_404(klass, **lookup)
+    obj = get(klass, lookup[field])
+    if obj is None:
+        raise Http404(f'{klass._meta.object_name} не найден')
+    return obj
+
+
+def post_author_key(post_id):
+    return f'lookup:post-author:{post_id}'
+
+
+def post_author_id(post_id):
+    """id автора поста, если он уже в кеше, иначе None."""
+    return cache.get(post_author_key(post_id))
+
+
+def remember_post_author(post):
+    cache.set(post_author_key(post.pk), post.author_id, LOOKUP_CACHE_TIMEOUT)
+
+
+def forget(instance):
+    """Стирает запись о значении поля instance, в том числе «не найден»."""
+    field, _ = LOOKUPS[type(instance)]
+    cache.delete(lookup_key(type(instance), getattr(instance, field)))
@@ -0,0 +1,89 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+
+from posts import benchmark
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Бенчмарк страниц постов на отдельной тестовой базе: перцентили '
+        'времени ответа и число SQL-запросов, сравнение с эталоном.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', choices=sorted(benchmark.SIZES), default='small',
+            help='Объём данных: small — 10 тыс. постов, large — 1 млн.')
+        parser.add_argument('--posts', type=int)
+        parser.add_argument('--users', type=int)
+        parser.add_argument('--groups', type=int)
+        parser.add_argument(
+            '--follows', type=int, default=20,
+            help='Сколько подписок выбирает каждый пользователь.')
+        parser.add_argument(
+            '--requests', type=int, default=30,
+            help='Сколько запросов делать к каждой странице.')
+        parser.add_argument(
+            '--warm', action='store_true',
+            help='Не чистить кеш между запросами.')
+        parser.add_argument(
+            '--baseline', help='JSON-файл эталона для сравнения.')
+        parser.add_argument(
+            '--save-baseline', action='store_true',
+            help='Записать результаты в --baseline вместо сравнения.')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Допустимое замедление p95 относительно эталона.')
+        parser.add_argument(
+            '--keepdb', action='store_true',
+            help='Не удалять тестовую базу и не наполнять её повторно.')
+
+    def handle(self, *args, **options):
+        size = {
+            key: options[key] or value
+            for key, value in benchmark.SIZES[options['size']].items()
+        }
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options['keepdb'])
+        try:
+            # Свой пустой кеш: общий кеш воркеров хранит версии
+            # рабочей базы, а run() его ещё и чистит
+            with benchmark.isolated_cache():
+                if not Post.objects.exists():
+                    self.stdout.write(f'Наполнение базы: {size}')
+                    benchmark.seed(follows=options['follows'], **size)
+                results = benchmark.run(
+                    options['requests'], options['warm'])
+        finally:
+            if not options['keepdb']:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+        self.report(results)
+        if not options['baseline']:
+            return
+        if options['save_baseline']:
+            with open(options['baseline'], 'w') as baseline:
+                json.dump(results, baseline, indent=2, sort_keys=True)
+            self.stdout.write(f'Эталон записан в {options["baseline"]}')
+            return
+        with open(options['baseline']) as baseline:
+            regressions = benchmark.compare(
+                results, json.load(baseline), options['tolerance'])
+        if regressions:
+            raise CommandError('Регрессии:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('Регрессий нет'))
+
+    def report(self, results):
+        self.stdout.write(
+            f'{"страница":<16}{"p50":>9}{"p95":>9}{"p99":>9}{"SQL":>6}')
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<16}{result["p50"]:>9}{result["p95"]:>9}'
+                f'{result["p99"]:>9}{result["queries"]:>6}')
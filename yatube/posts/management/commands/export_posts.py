@@ -0,0 +1,39 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import export
+
+
+class Command(BaseCommand):
+    help = 'Потоковая выгрузка постов, комментариев или подписок в NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'stream', nargs='?', default='posts',
+            choices=sorted(export.STREAMS))
+        parser.add_argument(
+            '--since',
+            help='Только записи новее этой даты (ISO 8601).')
+        parser.add_argument(
+            '--gzip', action='store_true', help='Сжимать вывод gzip.')
+        parser.add_argument(
+            '--output', help='Файл для записи; по умолчанию stdout.')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = export.parse_since(options['since'])
+            except ValueError as error:
+                raise CommandError(error)
+        chunks = export.export(options['stream'], since, options['gzip'])
+        if not options['output']:
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+        with open(options['output'], 'wb') as output:
+            for chunk in chunks:
+                output.write(chunk)
+        self.stderr.write(f'Выгрузка записана в {options["output"]}')
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import timeline
+
+
+class Command(BaseCommand):
+    help = ('Разбирает очередь и раскладывает посты популярных авторов '
+            'по лентам подписчиков.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать очередь один раз и завершиться.')
+        parser.add_argument(
+            '--batch', type=int, default=10,
+            help='Сколько заданий брать за один проход.')
+        parser.add_argument(
+            '--sleep', type=float, default=2.0,
+            help='Пауза в секундах, когда очередь пуста.')
+
+    def handle(self, *args, **options):
+        while True:
+            done = timeline.drain(options['batch'])
+            if done:
+                self.stdout.write(
+                    f'Готово: {done}, в очереди: {timeline.pending()}')
+            elif options['once']:
+                return
+            else:
+                time.sleep(options['sleep'])
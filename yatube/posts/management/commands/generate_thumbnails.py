@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts import thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Разбирает очередь и заранее строит миниатюры картинок постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать очередь один раз и завершиться.')
+        parser.add_argument(
+            '--batch', type=int, default=100,
+            help='Сколько заданий брать за один проход.')
+        parser.add_argument(
+            '--sleep', type=float, default=2.0,
+            help='Пауза в секундах, когда очередь пуста.')
+
+    def handle(self, *args, **options):
+        while True:
+            done = thumbnails.drain(options['batch'])
+            if done:
+                self.stdout.write(
+                    f'Готово: {done}, в очереди: {thumbnails.pending()}')
+            elif options['once']:
+                return
+            else:
+                time.sleep(options['sleep'])
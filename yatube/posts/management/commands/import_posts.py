@@ -0,0 +1,192 @@
+import csv
+import json
+import os
+import time
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Case, Value, When
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_naive, make_aware
+
+from core import versions
+from posts import counters, search, thumbnails, timeline
+from posts.models import Group, ImportCheckpoint, Post
+from posts.utils import bulk_create_posts
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Массовый импорт постов из JSONL или CSV '
+        '(поля text, author, group, pub_date, image).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл .jsonl или .csv')
+        parser.add_argument(
+            '--format', choices=('jsonl', 'csv'),
+            help='Формат файла; по умолчанию — по расширению.')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько постов вставлять одной транзакцией.')
+        parser.add_argument(
+            '--images-dir',
+            help='Каталог, относительно которого указаны картинки.')
+        parser.add_argument(
+            '--create-authors', action='store_true',
+            help='Создавать неизвестных авторов вместо пропуска строк.')
+        parser.add_argument(
+            '--checkpoint',
+            help='Имя отметки в БД, по которой продолжается прерванный '
+                 'импорт.')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть не меньше 1')
+        self.options = options
+        self.authors = dict(User.objects.values_list('username', 'id'))
+        self.groups = dict(Group.objects.values_list('slug', 'id'))
+        self.skipped = 0
+        done = resumed = self.read_checkpoint()
+        rows = islice(self.read_rows(), done, None)
+        started = time.monotonic()
+        imported = 0
+        while True:
+            batch = list(islice(rows, options['batch_size']))
+            if not batch:
+                break
+            done += len(batch)
+            imported += self.import_batch(batch, done)
+            # Скорость — по строкам этого запуска, включая пропущенные
+            rate = (done - resumed) / max(time.monotonic() - started, 1e-6)
+            self.stdout.write(
+                f'Строк обработано: {done}, постов: {imported}, '
+                f'{rate:.0f} строк/с'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано постов: {imported}, пропущено строк: '
+            f'{self.skipped}'
+        ))
+
+    def read_rows(self):
+        path = self.options['path']
+        file_format = self.options['format'] or (
+            'csv' if path.endswith('.csv') else 'jsonl')
+        try:
+            source = open(path, encoding='utf-8', newline='')
+        except OSError as error:
+            raise CommandError(f'Не удалось открыть {path}: {error}')
+        with source:
+            if file_format == 'csv':
+                yield from csv.DictReader(source)
+                return
+            for number, line in enumerate(source, start=1):
+                try:
+                    yield json.loads(line) if line.strip() else {}
+                except ValueError:
+                    raise CommandError(f'Строка {number}: некорректный JSON')
+
+    def read_checkpoint(self):
+        name = self.options['checkpoint']
+        if not name:
+            return 0
+        return ImportCheckpoint.objects.filter(name=name).values_list(
+            'rows', flat=True).first() or 0
+
+    def write_checkpoint(self, done):
+        # Вызывается в транзакции пачки: после сбоя отметка и посты
+        # либо сохранены вместе, либо вместе откатились
+        name = self.options['checkpoint']
+        if name:
+            ImportCheckpoint.objects.update_or_create(
+                name=name, defaults={'rows': done})
+
+    def author_id(self, username):
+        if username not in self.authors and self.options['create_authors']:
+            user = User(username=username)
+            user.set_unusable_password()
+            user.save()
+            self.authors[username] = user.id
+        return self.authors.get(username)
+
+    def build_post(self, row):
+        author_id = self.author_id(row.get('author') or '')
+        if not row.get('text') or author_id is None:
+            self.skipped += 1
+            return None
+        post = Post(
+            text=row['text'],
+            author_id=author_id,
+            group_id=self.groups.get(row.get('group') or ''),
+        )
+        # auto_now_add перезапишет pub_date при вставке, поэтому исходную
+        # дату храним отдельно и восстанавливаем после bulk_create
+        post.source_pub_date = None
+        if row.get('pub_date'):
+            pub_date = parse_datetime(row['pub_date'])
+            if pub_date is None:
+                self.skipped += 1
+                return None
+            post.source_pub_date = (
+                make_aware(pub_date) if is_naive(pub_date) else pub_date)
+        if row.get('image') and self.options['images_dir']:
+            post.image = self.store_image(row['image'])
+            post.thumbnails_ready = not post.image
+        return post
+
+    def store_image(self, relative_path):
+        path = os.path.join(self.options['images_dir'], relative_path)
+        if not os.path.isfile(path):
+            self.stderr.write(f'Картинка не найдена: {path}')
+            return ''
+        with open(path, 'rb') as image:
+            return default_storage.save(
+                f'posts/{os.path.basename(path)}', File(image))
+
+    def import_batch(self, rows, done):
+        posts = [post for post in map(self.build_post, rows) if post]
+        try:
+            with transaction.atomic():
+                self.write_checkpoint(done)
+                if not posts:
+                    return 0
+                bulk_create_posts(posts)
+                self.restore_pub_dates(posts)
+                # bulk_create не отправляет сигналы: повторяем их работу
+                counters.posts_imported(posts)
+                search.index_posts(posts)
+                timeline.fan_out_posts(posts)
+                thumbnails.enqueue_many(posts)
+        except BaseException:
+            # Картинки пачки сохранены до транзакции: без постов они лишние
+            for post in posts:
+                if post.image:
+                    default_storage.delete(post.image.name)
+            raise
+        versions.bump(
+            'posts',
+            *{f'author:{post.author_id}' for post in posts},
+            *{f'group:{post.group_id}' for post in posts if post.group_id},
+        )
+        return len(posts)
+
+    def restore_pub_dates(self, posts):
+        dated = [post for post in posts if post.source_pub_date]
+        if not dated:
+            return
+        field = Post._meta.get_field('pub_date')
+        Post.objects.filter(pk__in=[post.pk for post in dated]).update(
+            pub_date=Case(*(
+                When(pk=post.pk, then=Value(
+                    post.source_pub_date, output_field=field))
+                for post in dated
+            ), output_field=field)
+        )
+        for post in dated:
+            post.pub_date = post.source_pub_date
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов, комментариев и подписок.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            repaired = counters.recount()
+        for counter, rows in repaired.items():
+            self.stdout.write(f'{counter}: исправлено {rows}')
+        self.stdout.write(self.style.SUCCESS('Счётчики пересчитаны'))
@@ -0,0 +1,31 @@
+# Generated by Django 2.2.16 on 2026-10-18 06:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0020_thumbnail_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageDerivative',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('width', models.PositiveSmallIntegerField(verbose_name='Ширина')),
+                ('format', models.CharField(max_length=10, verbose_name='Формат')),
+                ('image', models.ImageField(upload_to='posts/derivatives/', verbose_name='Картинка')),
+                ('size', models.PositiveIntegerField(verbose_name='Размер, байт')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='derivatives', to='posts.Post', verbose_name='Пост')),
+            ],
+            options={
+                'verbose_name': 'Копия картинки',
+                'verbose_name_plural': 'Копии картинок',
+                'ordering': ('format', 'width'),
+                'unique_together': {('post', 'format', 'width')},
+            },
+        ),
+    ]
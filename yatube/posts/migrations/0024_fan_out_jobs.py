@@ -0,0 +1,27 @@
+# Generated by Django 2.2.16 on 2026-10-18 06:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0023_reactions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FanOutJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='fan_out_job', to='posts.Post', verbose_name='Пост')),
+            ],
+            options={
+                'verbose_name': 'Задание на раскладку ленты',
+                'verbose_name_plural': 'Задания на раскладку лент',
+                'ordering': ('created', 'id'),
+            },
+        ),
+    ]
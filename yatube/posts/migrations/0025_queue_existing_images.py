@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+def queue_images(apps, schema_editor):
+    """Ставит в очередь картинки, загруженные до очереди миниатюр."""
+    Post = apps.get_model('posts', 'Post')
+    ThumbnailJob = apps.get_model('posts', 'ThumbnailJob')
+    post_ids = list(Post.objects.exclude(image='').filter(
+        thumbnail_job=None, derivatives=None,
+    ).values_list('id', flat=True))
+    ThumbnailJob.objects.bulk_create(
+        (ThumbnailJob(post_id=post_id) for post_id in post_ids),
+        batch_size=500,
+    )
+    Post.objects.filter(thumbnail_job__isnull=False).update(
+        thumbnails_ready=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0024_fan_out_jobs'),
+    ]
+
+    operations = [
+        migrations.RunPython(queue_images, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 2.2.16 on 2026-10-18 06:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0025_queue_existing_images'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, unique=True, verbose_name='Имя')),
+                ('rows', models.PositiveIntegerField(default=0, verbose_name='Строк обработано')),
+            ],
+            options={
+                'verbose_name': 'Отметка импорта',
+                'verbose_name_plural': 'Отметки импорта',
+            },
+        ),
+    ]
@@ -13,6 +13,9 @@ class Group(models.Model):
         unique=True
     )
     description = models.TextField(_("Описание"))
+    posts_count = models.PositiveIntegerField(
+        _("Количество постов"), default=0, editable=False
+    )
 
     class Meta:
         verbose_name = _("Группа")
@@ -25,6 +28,7 @@ class Group(models.Model):
 class Post(models.Model):
     text = models.TextField(_("Текст"))
     pub_date = models.DateTimeField(_("Дата публикации"), auto_now_add=True)
+    modified = models.DateTimeField(_("Дата изменения"), auto_now=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -44,11 +48,34 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    comments_count = models.PositiveIntegerField(
+        _("Количество комментариев"), default=0, editable=False
+    )
+    thumbnails_ready = models.BooleanField(
+        _("Миниатюры готовы"), default=True, editable=False
+    )
+    views_count = models.PositiveIntegerField(
+        _("Количество просмотров"), default=0, editable=False
+    )
 
     class Meta:
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-id')
         verbose_name = _("Пост")
         verbose_name_plural = _("Посты")
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='post_pub_date_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_pub_date_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_pub_date_idx'
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.text[0:30]
@@ -75,9 +102,15 @@ class Comment(models.Model):
     created = models.DateTimeField(_("Дата публикации"), auto_now_add=True)
 
     class Meta:
-        ordering = ('-created',)
+        ordering = ('-created', '-id')
         verbose_name = _('Комментарий')
         verbose_name_plural = _('Комментарии')
+        indexes = [
+            models.Index(
+                fields=['post', '-created', '-id'],
+                name='comment_post_created_idx'
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.text[0:30]
@@ -100,3 +133,214 @@ class Follow(models.Model):
     class Meta:
         verbose_name = _('Подписка')
         verbose_name_plural = _('Подписки')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'author'],
+                name='unique_follow'
+            ),
+        ]
+        indexes = [
+            # Подписчики автора без обращения к таблице: для fan-out
+            models.Index(
+                fields=['author', 'user'],
+                name='follow_author_user_idx'
+            ),
+        ]
+
+
+class Reaction(models.Model):
+    """Отметка «нравится» пользователя на посте."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='reactions',
+        verbose_name=_("Пользователь")
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='reactions',
+        verbose_name=_("Пост")
+    )
+    created = models.DateTimeField(_("Дата"), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('Реакция')
+        verbose_name_plural = _('Реакции')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'],
+                name='unique_reaction'
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.user_id}: {self.post_id}'
+
+
+class ReactionCounter(models.Model):
+    """Часть (шард) счётчика реакций поста.
+
+    Реакции пользователя всегда попадают в шард user_id % числа шардов,
+    поэтому одновременные отметки популярного поста обновляют разные
+    строки, а итог — сумма шардов.
+    """
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='reaction_counters',
+        verbose_name=_("Пост")
+    )
+    shard = models.PositiveSmallIntegerField(_("Шард"))
+    count = models.IntegerField(_("Количество"), default=0)
+
+    class Meta:
+        verbose_name = _('Счётчик реакций')
+        verbose_name_plural = _('Счётчики реакций')
+        unique_together = ('post', 'shard')
+
+    def __str__(self) -> str:
+        return f'{self.post_id}/{self.shard}: {self.count}'
+
+
+class AuthorStats(models.Model):
+    """Счётчики пользователя, которые обновляются при записи."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name=_("Пользователь")
+    )
+    posts_count = models.PositiveIntegerField(
+        _("Количество постов"), default=0
+    )
+    followers_count = models.PositiveIntegerField(
+        _("Количество подписчиков"), default=0
+    )
+    following_count = models.PositiveIntegerField(
+        _("Количество подписок"), default=0
+    )
+
+    class Meta:
+        verbose_name = _('Счётчики автора')
+        verbose_name_plural = _('Счётчики авторов')
+
+    def __str__(self) -> str:
+        return str(self.user_id)
+
+
+class ImageDerivative(models.Model):
+    """Уменьшенная копия картинки поста в одном из форматов."""
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='derivatives',
+        verbose_name=_("Пост")
+    )
+    width = models.PositiveSmallIntegerField(_("Ширина"))
+    format = models.CharField(_("Формат"), max_length=10)
+    image = models.ImageField(
+        _("Картинка"),
+        upload_to='posts/derivatives/'
+    )
+    size = models.PositiveIntegerField(_("Размер, байт"))
+
+    class Meta:
+        ordering = ('format', 'width')
+        verbose_name = _('Копия картинки')
+        verbose_name_plural = _('Копии картинок')
+        unique_together = ('post', 'format', 'width')
+
+    def __str__(self) -> str:
+        return f'{self.post_id}: {self.width}w {self.format}'
+
+
+class ThumbnailJob(models.Model):
+    """Задание на подготовку миниатюр картинки поста."""
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='thumbnail_job',
+        verbose_name=_("Пост")
+    )
+    created = models.DateTimeField(_("Дата создания"), auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField(_("Попытки"), default=0)
+
+    class Meta:
+        ordering = ('created', 'id')
+        verbose_name = _('Задание на миниатюры')
+        verbose_name_plural = _('Задания на миниатюры')
+
+    def __str__(self) -> str:
+        return str(self.post_id)
+
+
+class FanOutJob(models.Model):
+    """Задание разложить пост популярного автора по лентам подписчиков."""
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='fan_out_job',
+        verbose_name=_("Пост")
+    )
+    created = models.DateTimeField(_("Дата создания"), auto_now_add=True)
+
+    class Meta:
+        ordering = ('created', 'id')
+        verbose_name = _('Задание на раскладку ленты')
+        verbose_name_plural = _('Задания на раскладку лент')
+
+    def __str__(self) -> str:
+        return str(self.post_id)
+
+
+class ImportCheckpoint(models.Model):
+    """Сколько строк источника уже импортировала команда import_posts."""
+    name = models.CharField(_("Имя"), max_length=200, unique=True)
+    rows = models.PositiveIntegerField(_("Строк обработано"), default=0)
+
+    class Meta:
+        verbose_name = _('Отметка импорта')
+        verbose_name_plural = _('Отметки импорта')
+
+    def __str__(self) -> str:
+        return f'{self.name}: {self.rows}'
+
+
+class TimelineEntry(models.Model):
+    """Запись материализованной ленты подписок пользователя."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name=_("Читатель")
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name=_("Пост")
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name=_("Автор")
+    )
+    pub_date = models.DateTimeField(_("Дата публикации"))
+
+    class Meta:
+        ordering = ('-pub_date', '-post_id')
+        verbose_name = _('Запись ленты')
+        verbose_name_plural = _('Записи ленты')
+        unique_together = ('user', 'post')
+        indexes = [
+            models.Index(
+                fields=['user', '-pub_date', '-post'],
+                name='timeline_user_pub_date_idx'
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.user_id}: {self.post_id}'
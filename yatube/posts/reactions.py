@@ -0,0 +1,45 @@
+"""Реакции «нравится» на посты.
+
+Отметка и снятие идемпотентны: повтор не меняет ни реакции, ни счётчик.
+Число реакций и отметку текущего пользователя лента получает
+подзапросами в том же запросе, что и сами посты.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import (BooleanField, Exists, OuterRef, Subquery, Sum,
+                              Value)
+from django.db.models.functions import Coalesce
+
+from .models import Reaction, ReactionCounter
+
+
+def with_reactions(queryset, user):
+    """Добавляет постам likes_count и liked (отметил ли user)."""
+    liked = Value(False, output_field=BooleanField())
+    if user.is_authenticated:
+        liked = Exists(Reaction.objects.filter(
+            post=OuterRef('pk'), user=user))
+    return queryset.annotate(
+        likes_count=Coalesce(Subquery(
+            ReactionCounter.objects.filter(post=OuterRef('pk'))
+            .order_by()
+            .values('post')
+            .annotate(total=Sum('count'))
+            .values('total')
+        ), 0),
+        liked=liked,
+    )
+
+
+def like(user, post_id):
+    """Ставит отметку; повторная отметка ничего не меняет."""
+    try:
+        with transaction.atomic():
+            Reaction.objects.get_or_create(user=user, post_id=post_id)
+    except IntegrityError:
+        # одновременный запрос уже поставил ту же отметку
+        pass
+
+
+def unlike(user, post_id):
+    """Снимает отметку, если она была."""
+    Reaction.objects.filter(user=user, post_id=post_id).delete()
@@ -0,0 +1,129 @@
+"""Полнотекстовый поиск по постам на виртуальной таблице SQLite FTS5.
+
+Таблица posts_post_fts хранит текст поста с rowid, равным id поста,
+и синхронизируется сигналами сохранения и удаления Post. Поиск
+возвращает только идентификаторы в порядке релевантности; сами посты
+загружаются лишь для показываемой страницы.
+"""
+import re
+
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+from .models import Post
+
+FTS_TABLE = 'posts_post_fts'
+TERM_RE = re.compile(r'(\w+)(\*?)')
+
+
+def is_available():
+    return connection.vendor == 'sqlite'
+
+
+def build_query(text):
+    """Превращает ввод пользователя в безопасный запрос FTS5.
+
+    Каждое слово берётся в кавычки, «слово*» остаётся поиском по префиксу.
+    """
+    return ' '.join(
+        f'"{word}"{star}' for word, star in TERM_RE.findall(text)
+    )
+
+
+def index_post(post):
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post.pk])
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, text, group_id, author_id) '
+            'VALUES (%s, %s, %s, %s)',
+            [post.pk, post.text, post.group_id, post.author_id]
+        )
+
+
+def index_posts(posts):
+    """Добавляет в индекс новые посты, созданные bulk_create."""
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, text, group_id, author_id) '
+            'VALUES (%s, %s, %s, %s)',
+            [(post.pk, post.text, post.group_id, post.author_id)
+             for post in posts]
+        )
+
+
+def remove_post(post_id):
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id])
+
+
+class SearchHits:
+    """Ленивая последовательность id найденных постов для Paginator."""
+
+    def __init__(self, text, group_id=None, author_id=None):
+        self.query = build_query(text)
+        self.where = f'{FTS_TABLE} MATCH %s'
+        self.params = [self.query]
+        if group_id is not None:
+            self.where += ' AND group_id = %s'
+            self.params.append(group_id)
+        if author_id is not None:
+            self.where += ' AND author_id = %s'
+            self.params.append(author_id)
+
+    def count(self):
+        if not self.query:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {FTS_TABLE} WHERE {self.where}',
+                self.params
+            )
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            raise TypeError('SearchHits поддерживает только срезы')
+        start = item.start or 0
+        if not self.query or item.stop <= start:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {self.where} '
+                'ORDER BY rank LIMIT %s OFFSET %s',
+                self.params + [item.stop - start, start]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+def search(text, group_id=None, author_id=None):
+    """Идентификаторы постов по запросу text, лучшие совпадения первыми."""
+    if is_available():
+        return SearchHits(text, group_id, author_id)
+    posts = Post.objects.filter(text__icontains=text)
+    if group_id is not None:
+        posts = posts.filter(group_id=group_id)
+    if author_id is not None:
+        posts = posts.filter(author_id=author_id)
+    return posts.values_list('pk', flat=True)
+
+
+def filter_queryset(queryset, text):
+    """Ограничивает queryset постами, найденными по text."""
+    if not is_available():
+        return queryset.filter(text__icontains=text)
+    query = build_query(text)
+    if not query:
+        return queryset.none()
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+        [query]
+    ))
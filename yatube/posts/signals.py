@@ -0,0 +1,150 @@
+from django.db.models import DEFERRED
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core import versions
+
+from . import counters, lookups, search, timeline
+from .models import Comment, Follow, Group, Post, Reaction, User
+
+# Поля пользователя, которые видны на страницах рядом с его постами
+DISPLAY_FIELDS = ('username', 'first_name', 'last_name')
+
+
+def touch_posts(**lookup):
+    """Обновляет modified у постов — их карточки в кеше устаревают."""
+    Post.objects.filter(**lookup).update(modified=timezone.now())
+
+
+def bump_post_versions(post, *group_ids):
+    versions.bump(
+        'posts',
+        f'post:{post.pk}',
+        f'author:{post.author_id}',
+        *(f'group:{group_id}' for group_id in {post.group_id, *group_ids}
+          if group_id is not None)
+    )
+
+
+def display_values(user):
+    # Отложенные поля не читаем, как и в remember_group
+    return tuple(
+        user.__dict__.get(field, DEFERRED) for field in DISPLAY_FIELDS)
+
+
+@receiver(post_init, sender=User)
+def remember_display(sender, instance, **kwargs):
+    instance._loaded_display = display_values(instance)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.ensure_stats(instance.pk)
+    # Вход, смена пароля и прочие поля на страницах не видны:
+    # кеш сбрасывается, только если изменилось имя
+    loaded = instance._loaded_display
+    if not created and loaded != display_values(instance):
+        touch_posts(author_id=instance.pk)
+        versions.bump('posts', 'users', f'author:{instance.pk}')
+    instance._loaded_display = display_values(instance)
+    lookups.forget(instance)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    lookups.forget(instance)
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, created, **kwargs):
+    if not created:
+        touch_posts(group_id=instance.pk)
+    versions.bump('posts', 'groups', f'group:{instance.pk}')
+    lookups.forget(instance)
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleting(sender, instance, **kwargs):
+    touch_posts(group_id=instance.pk)
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    versions.bump('posts', 'groups', f'group:{instance.pk}')
+    lookups.forget(instance)
+
+
+@receiver(post_init, sender=Post)
+def remember_group(sender, instance, **kwargs):
+    # Отложенное поле (only/defer) не читаем: это был бы запрос на объект
+    instance._loaded_group_id = instance.__dict__.get('group_id', DEFERRED)
+
+
+@receiver(pre_save, sender=Post)
+def load_group(sender, instance, raw=False, **kwargs):
+    if instance._loaded_group_id is DEFERRED:
+        instance._loaded_group_id = sender.objects.filter(
+            pk=instance.pk).values_list('group_id', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    search.index_post(instance)
+    bump_post_versions(instance, instance._loaded_group_id)
+    if raw:
+        return
+    if created:
+        counters.post_added(instance)
+        timeline.fan_out(instance)
+    elif instance.group_id != instance._loaded_group_id:
+        counters.post_regrouped(instance._loaded_group_id, instance.group_id)
+    instance._loaded_group_id = instance.group_id
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    counters.post_removed(instance)
+    search.remove_post(instance.pk)
+    bump_post_versions(instance)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.comment_added(instance)
+    versions.bump('comments', f'comments:{instance.post_id}')
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    counters.comment_removed(instance)
+    versions.bump('comments', f'comments:{instance.post_id}')
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.follow_added(instance)
+        timeline.backfill(instance.user_id, instance.author_id)
+        versions.bump('follows', f'timeline:{instance.user_id}')
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    counters.follow_removed(instance)
+    timeline.prune(instance.user_id, instance.author_id)
+    versions.bump('follows', f'timeline:{instance.user_id}')
+
+
+@receiver(post_save, sender=Reaction)
+def reaction_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.reaction_added(instance)
+
+
+@receiver(post_delete, sender=Reaction)
+def reaction_deleted(sender, instance, **kwargs):
+    counters.reaction_removed(instance)
@@ -0,0 +1,46 @@
+from django import template
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from yatube.settings import CARD_CACHE_TIMEOUT
+
+register = template.Library()
+
+CARD_TEMPLATE = 'includes/post_card.html'
+
+
+def card_key(post, show_author, show_links):
+    """Ключ карточки меняется при любом изменении поста (поле modified)."""
+    variant = f'{int(show_author)}{int(show_links)}'
+    return f'post_card:{variant}:{post.id}:{post.modified.timestamp()}'
+
+
+@register.simple_tag
+def post_cards(posts, show_author=True, show_links=True):
+    """Пары (пост, HTML-карточка): одно обращение к кешу на страницу.
+
+    Пост возвращается вместе с карточкой, чтобы шаблон мог дорисовать
+    к ней то, что зависит от пользователя и в кеш не попадает.
+    """
+    keys = {
+        card_key(post, show_author, show_links): post for post in posts
+    }
+    cards = cache.get_many(keys)
+    missing = {key: post for key, post in keys.items() if key not in cards}
+    # Копии картинок нужны только для карточек, которых нет в кеше
+    prefetch_related_objects(
+        [post for post in missing.values() if post.image], 'derivatives')
+    rendered = {
+        key: render_to_string(CARD_TEMPLATE, {
+            'post': post,
+            'show_author': show_author,
+            'show_links': show_links,
+        })
+        for key, post in missing.items()
+    }
+    if rendered:
+        cache.set_many(rendered, CARD_CACHE_TIMEOUT)
+        cards.update(rendered)
+    return [(post, mark_safe(cards[key])) for key, post in keys.items()]
@@ -0,0 +1,11 @@
+from django import template
+
+from posts import derivatives
+
+register = template.Library()
+
+
+@register.filter
+def picture(post):
+    """Источники srcset для картинки поста или None, если копий нет."""
+    return derivatives.picture(post)
@@ -0,0 +1,66 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from posts import benchmark
+from posts.models import AuthorStats, Follow, Post, TimelineEntry
+
+
+class BenchmarkTests(TestCase):
+    def test_seed_builds_consistent_data(self):
+        """Наполнение создаёт посты, подписки, ленты и счётчики."""
+        benchmark.seed(posts=60, users=12, groups=3, follows=4)
+        self.assertEqual(Post.objects.count(), 60)
+        self.assertTrue(Follow.objects.exists())
+        self.assertTrue(TimelineEntry.objects.exists())
+        self.assertEqual(
+            sum(AuthorStats.objects.values_list('posts_count', flat=True)),
+            60)
+
+    def test_run_measures_every_view(self):
+        """Замер отдаёт перцентили и число запросов по каждой странице."""
+        benchmark.seed(posts=60, users=12, groups=3, follows=4)
+        results = benchmark.run(requests=2)
+        self.assertEqual(set(results), {
+            'index', 'index_page_50', 'group_list', 'profile',
+            'post_detail', 'follow_index',
+        })
+        for result in results.values():
+            self.assertLessEqual(result['p50'], result['p99'])
+            self.assertGreater(result['queries'], 0)
+
+    def test_compare_reports_regressions(self):
+        """Лишний запрос или медленный p95 считаются регрессией."""
+        baseline = {'index': {'p50': 1, 'p95': 10, 'p99': 12, 'queries': 3}}
+        same = {'index': {'p50': 1, 'p95': 11, 'p99': 12, 'queries': 3}}
+        slower = {'index': {'p50': 1, 'p95': 20, 'p99': 25, 'queries': 4}}
+        self.assertEqual(benchmark.compare(same, baseline), [])
+        self.assertEqual(len(benchmark.compare(slower, baseline)), 2)
+
+    def test_timelines_limited(self):
+        """Лента читателя получает не больше limit последних постов."""
+        benchmark.seed(posts=60, users=12, groups=3, follows=4)
+        TimelineEntry.objects.all().delete()
+        benchmark.seed_timelines(limit=3)
+        reader = Follow.objects.values_list('user_id', flat=True).first()
+        entries = TimelineEntry.objects.filter(user_id=reader)
+        self.assertLessEqual(entries.count(), 3)
+        self.assertEqual(
+            list(entries.values_list('post_id', flat=True)),
+            list(Post.objects.filter(
+                author__following__user_id=reader,
+            ).values_list('id', flat=True)[:entries.count()]))
+
+    def test_percentile(self):
+        """Перцентили интерполируются между соседними значениями."""
+        values = [4, 1, 3, 2]
+        self.assertEqual(benchmark.percentile(values, 50), 2.5)
+        self.assertEqual(benchmark.percentile(values, 100), 4)
+        self.assertAlmostEqual(benchmark.percentile(values, 95), 3.85)
+
+    def test_isolated_cache(self):
+        """Замер чистит свой кеш, а не общий."""
+        cache.set('shared', 1)
+        with benchmark.isolated_cache():
+            cache.set('shared', 2)
+            cache.clear()
+        self.assertEqual(cache.get('shared'), 1)
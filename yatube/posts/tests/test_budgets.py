@@ -0,0 +1,67 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import resolve, reverse
+
+from core.budgets import BUDGETS
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class QueryBudgetTests(TestCase):
+    """Каждая лента укладывается в бюджет и при 1, и при 100 записях."""
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create(username='author')
+        self.reader = User.objects.create(username='reader')
+        self.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def fill(self, size):
+        """Доводит число постов до size; у последнего — комментарии."""
+        commenters = [
+            User.objects.create(username=f'commenter{size}-{number}')
+            for number in range(min(size, 20))
+        ]
+        for number in range(Post.objects.count(), size):
+            post = Post.objects.create(
+                author=self.author, group=self.group, text=f'Пост {number}')
+        for commenter in commenters:
+            Comment.objects.create(post=post, author=commenter, text='Ок')
+        return post
+
+    def urls(self, post):
+        return (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.author.username]),
+            reverse('posts:post_detail', args=[post.id]),
+            reverse('posts:post_comments', args=[post.id]),
+            reverse('posts:follow_index'),
+            f'{reverse("posts:search")}?q=Пост',
+            reverse('api:posts'),
+            reverse('api:post_detail', args=[post.id]),
+            reverse('api:comments', args=[post.id]),
+            reverse('api:group_posts', args=[self.group.slug]),
+            reverse('api:author_posts', args=[self.author.username]),
+            reverse('api:follow_posts'),
+        )
+
+    def test_views_within_budget(self):
+        checked = set()
+        for size in (1, 100):
+            post = self.fill(size)
+            for url in self.urls(post):
+                view = resolve(url.split('?')[0]).func
+                name = f'{view.__module__}.{view.__name__}'
+                checked.add(name)
+                with self.subTest(size=size, url=url):
+                    cache.clear()
+                    response = self.client.get(url)
+                    self.assertEqual(response.status_code, 200)
+                    self.assertLessEqual(
+                        int(response['X-Query-Count']), BUDGETS[name])
+        # новый view с бюджетом должен попасть и в urls()
+        self.assertEqual(checked, set(BUDGETS))
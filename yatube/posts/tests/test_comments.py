@@ -0,0 +1,77 @@
+import base64
+import json
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Post, User
+
+from yatube.settings import COMMENTS_PER_PAGE
+
+EXTRA_COMMENTS = 3
+# Курсоры, которые декодируются, но содержат негодные значения
+TAMPERED_CURSORS = [
+    base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+    for data in (
+        [1, ['garbage', 'x']],
+        [1, ['2020-01-01T00:00:00+00:00', 'abc']],
+        [1, [None, None]],
+    )
+]
+
+
+class CommentsPaginationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='author')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+        for number in range(COMMENTS_PER_PAGE + EXTRA_COMMENTS):
+            Comment.objects.create(
+                post=cls.post,
+                author=User.objects.create(username=f'reader{number}'),
+                text=f'Комментарий {number}',
+            )
+        cls.DETAIL_URL = reverse('posts:post_detail', args=[cls.post.id])
+        cls.COMMENTS_URL = reverse('posts:post_comments', args=[cls.post.id])
+
+    def setUp(self):
+        cache.clear()
+
+    def test_first_page_embedded(self):
+        """На странице поста — первая страница комментариев и счётчик."""
+        response = self.client.get(self.DETAIL_URL)
+        comments = response.context['comments']
+        self.assertEqual(len(comments), COMMENTS_PER_PAGE)
+        self.assertTrue(comments.has_next())
+        self.assertEqual(
+            comments[0].text, f'Комментарий {COMMENTS_PER_PAGE + 2}')
+        self.assertContains(
+            response, f'Комментариев: {COMMENTS_PER_PAGE + EXTRA_COMMENTS}')
+
+    def test_fragment_returns_next_page(self):
+        """Фрагмент по курсору отдаёт оставшиеся комментарии."""
+        first = self.client.get(self.DETAIL_URL).context['comments']
+        response = self.client.get(
+            self.COMMENTS_URL, {'after': first.next_cursor})
+        rest = response.context['comments']
+        self.assertEqual(len(rest), EXTRA_COMMENTS)
+        self.assertFalse(rest.has_next())
+        self.assertTrue(set(first).isdisjoint(rest))
+        self.assertNotContains(response, '<html')
+
+    def test_tampered_cursor_opens_first_page(self):
+        """Курсор с негодными значениями отдаёт первую страницу."""
+        for url in (self.DETAIL_URL, self.COMMENTS_URL):
+            for cursor in TAMPERED_CURSORS:
+                with self.subTest(url=url, cursor=cursor):
+                    comments = self.client.get(
+                        url, {'after': cursor}).context['comments']
+                    self.assertEqual(len(comments), COMMENTS_PER_PAGE)
+                    self.assertFalse(comments.has_previous())
+
+    def test_authors_loaded_in_one_query(self):
+        """Число запросов не зависит от числа авторов комментариев."""
+        with self.assertNumQueries(2):
+            self.client.get(self.COMMENTS_URL)
@@ -0,0 +1,72 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import AuthorStats, Comment, Follow, Group, Post, User
+
+USERNAME = 'author'
+SLUG = 'test-slug'
+FOLLOW_PROFILE_URL = reverse('posts:profile_follow', args=[USERNAME])
+UNFOLLOW_PROFILE_URL = reverse('posts:profile_unfollow', args=[USERNAME])
+
+
+class CounterTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username=USERNAME)
+        cls.reader = User.objects.create(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=SLUG,
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_post_and_comment_counters(self):
+        """Счётчики постов и комментариев следуют за созданием
+        и удалением объектов."""
+        post = Post.objects.create(
+            author=self.user, text='Тестовый пост', group=self.group)
+        Comment.objects.create(post=post, author=self.reader, text='Ок')
+        post.refresh_from_db()
+        self.group.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(self.group.posts_count, 1)
+        stats = AuthorStats.objects.get(user=self.user)
+        self.assertEqual(stats.posts_count, 1)
+        post.delete()
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 0)
+        stats.refresh_from_db()
+        self.assertEqual(stats.posts_count, 0)
+
+    def test_follow_counters(self):
+        """Подписка и отписка меняют счётчики обоих пользователей."""
+        self.reader_client.get(FOLLOW_PROFILE_URL)
+        self.reader_client.get(FOLLOW_PROFILE_URL)
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.user).followers_count, 1)
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.reader).following_count, 1)
+        self.reader_client.get(UNFOLLOW_PROFILE_URL)
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.user).followers_count, 0)
+
+    def test_recount_repairs_drift(self):
+        """Команда recount_counters исправляет расхождения."""
+        Post.objects.create(author=self.user, text='Тестовый пост')
+        Follow.objects.create(user=self.reader, author=self.user)
+        AuthorStats.objects.update(
+            posts_count=42, followers_count=42, following_count=42)
+        call_command('recount_counters', stdout=StringIO())
+        stats = AuthorStats.objects.get(user=self.user)
+        self.assertEqual(stats.posts_count, 1)
+        self.assertEqual(stats.followers_count, 1)
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.reader).following_count, 1)
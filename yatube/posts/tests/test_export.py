@@ -0,0 +1,55 @@
+import gzip
+import json
+
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Post, User
+
+EXPORT_POSTS_URL = reverse('posts:export', args=['posts'])
+EXPORT_FOLLOWS_URL = reverse('posts:export', args=['follows'])
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='author')
+        cls.staff = User.objects.create(username='staff', is_staff=True)
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+        Comment.objects.create(post=cls.post, author=cls.staff, text='Ок')
+        Follow.objects.create(user=cls.staff, author=cls.user)
+
+    def setUp(self):
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+        self.author_client = Client()
+        self.author_client.force_login(self.user)
+
+    def read(self, response):
+        body = b''.join(response.streaming_content)
+        if response['Content-Type'] == 'application/gzip':
+            body = gzip.decompress(body)
+        return [json.loads(line) for line in body.decode().splitlines()]
+
+    def test_export_is_staff_only(self):
+        """Выгрузка доступна только сотрудникам."""
+        response = self.author_client.get(EXPORT_POSTS_URL)
+        self.assertEqual(response.status_code, 302)
+
+    def test_export_posts_plain_and_gzip(self):
+        """Посты выгружаются в NDJSON, в том числе сжатом."""
+        for params in ({}, {'gzip': 1}):
+            with self.subTest(params=params):
+                records = self.read(
+                    self.staff_client.get(EXPORT_POSTS_URL, params))
+                self.assertEqual(len(records), 1)
+                self.assertEqual(records[0]['text'], self.post.text)
+
+    def test_export_since_and_follows(self):
+        """--since отсекает старые записи, подписки идут своим потоком."""
+        records = self.read(self.staff_client.get(
+            EXPORT_POSTS_URL, {'since': '2999-01-01'}))
+        self.assertEqual(records, [])
+        follows = self.read(self.staff_client.get(EXPORT_FOLLOWS_URL))
+        self.assertEqual(follows[0]['user_id'], self.staff.id)
@@ -0,0 +1,81 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+RSS_URL = reverse('posts:rss')
+ATOM_URL = reverse('posts:atom')
+
+
+class FeedsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='author')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание')
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Первый пост')
+        cls.GROUP_RSS_URL = reverse('posts:group_rss', args=['group'])
+        cls.PROFILE_ATOM_URL = reverse(
+            'posts:profile_atom', args=['author'])
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feeds_list_posts(self):
+        """Ленты содержат посты и имеют свой тип содержимого."""
+        for url, content_type in (
+            (RSS_URL, 'application/rss+xml'),
+            (ATOM_URL, 'application/atom+xml'),
+            (self.GROUP_RSS_URL, 'application/rss+xml'),
+            (self.PROFILE_ATOM_URL, 'application/atom+xml'),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertTrue(response['Content-Type'].startswith(
+                    content_type))
+                self.assertIn(self.post.text, response.content.decode())
+                self.assertIn('ETag', response)
+
+    def test_unknown_group_is_404(self):
+        """Лента несуществующей группы отвечает 404."""
+        url = reverse('posts:group_rss', args=['missing'])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_not_modified_after_one_query(self):
+        """Свежая копия читателя подтверждается 304 за один запрос."""
+        etag = self.client.get(self.GROUP_RSS_URL)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                self.GROUP_RSS_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_body_cached_until_new_post(self):
+        """Тело ленты берётся из кеша, пока не появится новый пост."""
+        self.client.get(RSS_URL)
+        with self.assertNumQueries(1):
+            self.client.get(RSS_URL)
+        Post.objects.create(author=self.author, text='Второй пост')
+        self.assertIn('Второй пост', self.client.get(RSS_URL).content.decode())
+
+    def test_old_post_edit_not_hidden_by_if_modified_since(self):
+        """Правка старого поста видна читателю с If-Modified-Since."""
+        Post.objects.create(author=self.author, text='Второй пост')
+        first = self.client.get(RSS_URL)
+        self.assertNotIn('Last-Modified', first)
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Исправленный пост'
+        post.save()
+        response = self.client.get(
+            RSS_URL, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Исправленный пост', response.content.decode())
+
+    def test_body_cached_per_host(self):
+        """Ссылки ленты ведут на хост, с которого её запросили."""
+        self.client.get(RSS_URL)
+        response = self.client.get(RSS_URL, HTTP_HOST='localhost')
+        self.assertIn('http://localhost/', response.content.decode())
+        self.assertNotIn('testserver', response.content.decode())
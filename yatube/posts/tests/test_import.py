@@ -0,0 +1,91 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from posts.models import (AuthorStats, Follow, Group, ImportCheckpoint, Post,
+                          TimelineEntry, User)
+
+USERNAME = 'author'
+SLUG = 'test-slug'
+
+
+class ImportPostsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username=USERNAME)
+        cls.reader = User.objects.create(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=SLUG,
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.reader, author=cls.user)
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'posts.jsonl')
+        self.checkpoint = 'posts.jsonl'
+        rows = [
+            {'text': f'Импорт {i}', 'author': USERNAME, 'group': SLUG,
+             'pub_date': f'2020-01-{i + 1:02d}T10:00:00'}
+            for i in range(5)
+        ] + [{'text': 'Неизвестный автор', 'author': 'nobody'}]
+        with open(self.path, 'w', encoding='utf-8') as source:
+            source.writelines(json.dumps(row) + '\n' for row in rows)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def import_posts(self, *args):
+        call_command('import_posts', self.path, '--batch-size', '2',
+                     '--checkpoint', self.checkpoint, *args,
+                     stdout=StringIO())
+
+    def test_import_applies_side_effects(self):
+        """Импорт сохраняет даты и обновляет счётчики и ленты."""
+        self.import_posts()
+        posts = Post.objects.filter(text__startswith='Импорт')
+        self.assertEqual(posts.count(), 5)
+        self.assertEqual(posts.last().pub_date.year, 2020)
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.user).posts_count, 5)
+        self.assertEqual(Group.objects.get(slug=SLUG).posts_count, 5)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 5)
+        self.assertFalse(Post.objects.filter(text='Неизвестный автор'))
+
+    def test_import_resumes_from_checkpoint(self):
+        """Повторный запуск продолжает с сохранённой позиции."""
+        ImportCheckpoint.objects.create(name=self.checkpoint, rows=4)
+        self.import_posts('--create-authors')
+        self.assertEqual(
+            set(Post.objects.values_list('text', flat=True)),
+            {'Импорт 4', 'Неизвестный автор'}
+        )
+        self.assertEqual(
+            ImportCheckpoint.objects.get(name=self.checkpoint).rows, 6)
+
+    def test_failed_batch_keeps_checkpoint(self):
+        """Сбой пачки откатывает и посты, и отметку прогресса."""
+        with mock.patch('posts.search.index_posts',
+                        side_effect=[None, RuntimeError]):
+            with self.assertRaises(RuntimeError):
+                self.import_posts()
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(
+            ImportCheckpoint.objects.get(name=self.checkpoint).rows, 2)
+
+    def test_batch_size_must_be_positive(self):
+        """Пачка меньше одной строки — ошибка, а не пустой импорт."""
+        for size in ('0', '-1'):
+            with self.subTest(size=size):
+                with self.assertRaises(CommandError):
+                    call_command('import_posts', self.path,
+                                 '--batch-size', size, stdout=StringIO())
+        self.assertFalse(Post.objects.exists())
@@ -0,0 +1,82 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+
+USERNAME = 'author'
+SLUG = 'test-slug'
+
+HOME_URL = reverse('posts:index')
+GROUP_LIST_URL = reverse('posts:group_list', args=[SLUG])
+PROFILE_URL = reverse('posts:profile', args=[USERNAME])
+FOLLOW_INDEX_URL = reverse('posts:follow_index')
+
+
+class FeedIndexTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username=USERNAME)
+        cls.reader = User.objects.create(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=SLUG,
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.reader, author=cls.user)
+        for i in range(15):
+            cls.post = Post.objects.create(
+                author=cls.user, text=f'Тестовый пост {i}', group=cls.group)
+            Comment.objects.create(
+                post=cls.post, author=cls.reader, text=f'Комментарий {i}')
+        cls.POST_DETAIL_URL = reverse('posts:post_detail', args=[cls.post.id])
+
+    def setUp(self):
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def get_sorted_queries(self, url, data=None):
+        # иначе ленту отдаст кешированный фрагмент без запросов
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            self.reader_client.get(url, data)
+        return [
+            query['sql'] for query in context.captured_queries
+            if 'ORDER BY' in query['sql']
+        ]
+
+    def test_feed_queries_use_index_for_ordering(self):
+        """Ленты сортируются по индексу, без временного B-дерева."""
+        first_page = self.reader_client.get(HOME_URL).context['page_obj']
+        requests = [
+            (HOME_URL, None),
+            (HOME_URL, {'after': first_page.next_cursor}),
+            (GROUP_LIST_URL, None),
+            (PROFILE_URL, None),
+            (FOLLOW_INDEX_URL, None),
+            (self.POST_DETAIL_URL, None),
+        ]
+        for url, data in requests:
+            queries = self.get_sorted_queries(url, data)
+            with self.subTest(url=url, data=data):
+                self.assertTrue(queries)
+            for sql in queries:
+                with self.subTest(url=url, sql=sql):
+                    with connection.cursor() as cursor:
+                        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                        plan = ' '.join(
+                            str(row[-1]) for row in cursor.fetchall())
+                    self.assertIn('INDEX', plan)
+                    self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_follow_is_unique(self):
+        """Повторная подписка не создаёт дубликат."""
+        self.reader_client.get(
+            reverse('posts:profile_follow', args=[USERNAME]))
+        self.assertEqual(
+            Follow.objects.filter(user=self.reader, author=self.user).count(),
+            1
+        )
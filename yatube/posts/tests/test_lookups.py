@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from django.http import Http404
+from django.test import TestCase
+
+from posts import lookups
+from posts.models import Group, Post, User
+
+
+class LookupCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        cls.author = User.objects.create(username='author')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_found_object_cached(self):
+        """Повторный поиск группы и автора не обращается к БД."""
+        lookups.get(Group, 'group')
+        lookups.get(User, 'author')
+        with self.assertNumQueries(0):
+            self.assertEqual(lookups.get(Group, 'group'), self.group)
+            self.assertEqual(lookups.get(User, 'author'), self.author)
+
+    def test_missing_object_cached(self):
+        """«Не найден» кешируется и сбрасывается появлением объекта."""
+        self.assertIsNone(lookups.get(User, 'nobody'))
+        with self.assertNumQueries(0):
+            self.assertIsNone(lookups.get(User, 'nobody'))
+        user = User.objects.create(username='nobody')
+        self.assertEqual(lookups.get(User, 'nobody'), user)
+
+    def test_counter_change_invalidates(self):
+        """Новый пост группы сбрасывает её запись вместе со счётчиком."""
+        self.assertEqual(lookups.get(Group, 'group').posts_count, 0)
+        Post.objects.create(author=self.author, group=self.group, text='Пост')
+        self.assertEqual(lookups.get(Group, 'group').posts_count, 1)
+
+    def test_rename_and_delete(self):
+        """Переименованный и удалённый объекты по старому ключу не найти."""
+        group = Group.objects.create(title='Старая', slug='old')
+        lookups.get(Group, 'old')
+        group.slug = 'new'
+        group.save()
+        self.assertIsNone(lookups.get(Group, 'old'))
+        self.assertEqual(lookups.get(Group, 'new'), group)
+        user = User.objects.create(username='leaving')
+        lookups.get(User, 'leaving')
+        user.delete()
+        self.assertIsNone(lookups.get(User, 'leaving'))
+
+    def test_get_object_or_404(self):
+        """Замена get_object_or_404: 404 для отсутствующих, иначе объект."""
+        with self.assertRaises(Http404):
+            lookups.get_object_or_404(Group, slug='missing')
+        self.assertEqual(
+            lookups.get_object_or_404(Group, pk=self.group.pk), self.group)
@@ -0,0 +1,130 @@
+import base64
+import json
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.paginator import ElidedPaginator, cached_count
+from posts.models import Post, User
+
+from yatube.settings import POSTS_PER_PAGE
+
+PAGE_2_POSTS = 3
+USERNAME = 'author'
+
+HOME_URL = reverse('posts:index')
+PROFILE_URL = reverse('posts:profile', args=[USERNAME])
+# Курсоры, которые декодируются, но содержат негодные значения
+TAMPERED_CURSORS = [
+    base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+    for data in (
+        [1, ['garbage', 'x']],
+        [1, ['2020-01-01T00:00:00+00:00', 'abc']],
+        [1, {'a': 1}],
+        [1, [None, None]],
+        [1, ['2020-01-01T00:00:00+00:00']],
+        ['1', ['2020-01-01T00:00:00+00:00', '1']],
+    )
+]
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username=USERNAME)
+        for i in range(POSTS_PER_PAGE + PAGE_2_POSTS):
+            Post.objects.create(author=cls.user, text=f'Тестовый пост {i}')
+
+    def setUp(self):
+        self.client = Client()
+
+    def test_next_and_previous_cursors(self):
+        """Курсоры ведут на следующую и обратно на первую страницу."""
+        first = self.client.get(PROFILE_URL).context['page_obj']
+        second = self.client.get(
+            PROFILE_URL, {'after': first.next_cursor}).context['page_obj']
+        self.assertEqual(second.number, 2)
+        self.assertEqual(len(second), PAGE_2_POSTS)
+        self.assertFalse(second.has_next())
+        self.assertTrue(set(first).isdisjoint(second))
+        back = self.client.get(
+            PROFILE_URL, {'before': second.previous_cursor}
+        ).context['page_obj']
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+
+    def test_legacy_page_number_matches_cursor_page(self):
+        """Старая ссылка ?page=2 показывает те же посты, что и курсор."""
+        first = self.client.get(HOME_URL).context['page_obj']
+        by_cursor = self.client.get(HOME_URL, {'after': first.next_cursor})
+        by_number = self.client.get(HOME_URL, {'page': 2})
+        self.assertEqual(
+            list(by_cursor.context['page_obj']),
+            list(by_number.context['page_obj']),
+        )
+
+    def test_broken_cursor_falls_back_to_first_page(self):
+        """Испорченный курсор открывает первую страницу."""
+        page = self.client.get(
+            HOME_URL, {'after': 'not-a-cursor'}).context['page_obj']
+        self.assertEqual(page.number, 1)
+        self.assertEqual(len(page), POSTS_PER_PAGE)
+
+    def test_tampered_cursor_falls_back_to_first_page(self):
+        """Курсор с негодными значениями тоже открывает первую страницу."""
+        for cursor in TAMPERED_CURSORS:
+            for direction in ('after', 'before'):
+                with self.subTest(cursor=cursor, direction=direction):
+                    page = self.client.get(
+                        PROFILE_URL, {direction: cursor}
+                    ).context['page_obj']
+                    self.assertEqual(page.number, 1)
+
+
+class ElidedPaginatorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_window_around_current_page(self):
+        """Навигация показывает края и окно вокруг текущей страницы."""
+        paginator = ElidedPaginator(range(1000), 10)
+        self.assertEqual(
+            list(paginator.get_elided_page_range(50)),
+            [1, '…', 48, 49, 50, 51, 52, '…', 100],
+        )
+        self.assertEqual(
+            list(paginator.get_elided_page_range(1)),
+            [1, 2, 3, '…', 100],
+        )
+        self.assertEqual(
+            list(ElidedPaginator(range(50), 10).get_elided_page_range(3)),
+            [1, 2, 3, 4, 5],
+        )
+
+    def test_known_count_skips_query(self):
+        """Переданное число записей заменяет COUNT(*)."""
+        paginator = ElidedPaginator(Post.objects.all(), 10, count=12345)
+        with self.assertNumQueries(0):
+            self.assertEqual(paginator.num_pages, 1235)
+
+    def test_cached_count_invalidated_on_write(self):
+        """Кешированный COUNT(*) ленты сбрасывается новым постом."""
+        user = User.objects.create(username=USERNAME)
+        self.assertEqual(cached_count(Post.objects.all(), 'posts'), 0)
+        with self.assertNumQueries(0):
+            cached_count(Post.objects.all(), 'posts')
+        Post.objects.create(author=user, text='Пост')
+        self.assertEqual(cached_count(Post.objects.all(), 'posts'), 1)
+
+    def test_large_feed_shows_only_newer_older(self):
+        """У очень длинной ленты нет номеров страниц, только «Старше»."""
+        user = User.objects.create(username=USERNAME)
+        for i in range(POSTS_PER_PAGE + 1):
+            Post.objects.create(author=user, text=f'Тестовый пост {i}')
+        with mock.patch('core.paginator.PAGINATOR_MAX_NUMBERED_PAGES', 1):
+            content = self.client.get(HOME_URL).content.decode()
+        self.assertIn('Старше', content)
+        self.assertNotIn('page=2', content)
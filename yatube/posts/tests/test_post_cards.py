@@ -0,0 +1,58 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+from posts.templatetags.post_cards import card_key, post_cards
+
+SLUG = 'test-slug'
+HOME_URL = reverse('posts:index')
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=SLUG,
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text='Тестовый пост', group=cls.group)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+
+    def test_card_rendered_once_and_reused(self):
+        """Карточка берётся из кеша без повторной отрисовки."""
+        posts = list(Post.objects.select_related('author', 'group'))
+        first = post_cards(posts)
+        self.assertIsNotNone(cache.get(card_key(self.post, True, True)))
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(post_cards(posts), first)
+        self.assertEqual(len(context.captured_queries), 0)
+
+    def test_group_rename_refreshes_card(self):
+        """Переименование группы обновляет карточки её постов."""
+        self.client.get(HOME_URL)
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название'
+        group.save()
+        self.assertContains(self.client.get(HOME_URL), group.title)
+
+    def test_only_name_change_refreshes_cards(self):
+        """Карточки автора обновляет смена имени, а не пароля."""
+        modified = Post.objects.get(pk=self.post.pk).modified
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('новый-пароль')
+        user.save()
+        self.assertEqual(Post.objects.get(pk=self.post.pk).modified, modified)
+        user.first_name = 'Новое имя'
+        user.save()
+        self.assertNotEqual(
+            Post.objects.get(pk=self.post.pk).modified, modified)
@@ -0,0 +1,106 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import counters, reactions
+from posts.models import Post, Reaction, ReactionCounter, User
+
+from yatube.settings import REACTION_COUNTER_SHARDS
+
+
+class ReactionsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='author')
+        cls.readers = [
+            User.objects.create(username=f'reader{number}')
+            for number in range(REACTION_COUNTER_SHARDS + 1)
+        ]
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+        cls.LIKE_URL = reverse('posts:post_like', args=[cls.post.id])
+        cls.UNLIKE_URL = reverse('posts:post_unlike', args=[cls.post.id])
+
+    def setUp(self):
+        self.reader = Client()
+        self.reader.force_login(self.readers[0])
+
+    def likes(self):
+        return reactions.with_reactions(
+            Post.objects.filter(pk=self.post.pk), self.readers[0]
+        ).get().likes_count
+
+    def test_like_and_unlike_are_idempotent(self):
+        """Повторные отметка и снятие не меняют счётчик."""
+        for _ in range(2):
+            self.reader.post(self.LIKE_URL)
+        self.assertEqual(Reaction.objects.count(), 1)
+        self.assertEqual(self.likes(), 1)
+        for _ in range(2):
+            self.reader.post(self.UNLIKE_URL)
+        self.assertFalse(Reaction.objects.exists())
+        self.assertEqual(self.likes(), 0)
+
+    def test_counter_is_sharded(self):
+        """Реакции разных пользователей расходятся по шардам."""
+        for reader in self.readers:
+            reactions.like(reader, self.post.id)
+        self.assertEqual(
+            ReactionCounter.objects.filter(post=self.post).count(),
+            REACTION_COUNTER_SHARDS)
+        self.assertEqual(self.likes(), len(self.readers))
+
+    def test_feed_reactions_in_one_query(self):
+        """Лента получает число реакций и свою отметку одним запросом."""
+        reactions.like(self.readers[0], self.post.id)
+        reactions.like(self.readers[1], self.post.id)
+        with self.assertNumQueries(1):
+            posts = list(reactions.with_reactions(
+                Post.objects.all(), self.readers[0]))
+        self.assertEqual(posts[0].likes_count, 2)
+        self.assertTrue(posts[0].liked)
+
+    def test_like_requires_login_and_post(self):
+        """Отметка — только POST и только для вошедших."""
+        self.assertEqual(self.client.post(self.LIKE_URL).status_code, 302)
+        self.assertFalse(Reaction.objects.exists())
+        self.assertEqual(self.reader.get(self.LIKE_URL).status_code, 405)
+
+    def test_json_response(self):
+        """Запрос из скрипта получает новое состояние в JSON."""
+        response = self.reader.post(
+            self.LIKE_URL, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.json(), {'likes_count': 1, 'liked': True})
+
+    def test_missing_post_is_404(self):
+        """Отметка и снятие на несуществующем посте отвечают 404."""
+        for name in ('posts:post_like', 'posts:post_unlike'):
+            with self.subTest(name=name):
+                response = self.reader.post(
+                    reverse(name, args=[0]), HTTP_ACCEPT='application/json')
+                self.assertEqual(response.status_code, 404)
+
+    def test_cached_feed_shows_own_likes(self):
+        """Фрагмент ленты общий, а лайки в нём у каждого свои."""
+        cache.clear()
+        reactions.like(self.readers[0], self.post.id)
+        url = reverse('posts:profile', args=[self.author.username])
+        other = Client()
+        other.force_login(self.readers[1])
+        self.assertContains(self.reader.get(url), 'btn-primary')
+        with CaptureQueriesContext(connection) as context:
+            response = other.get(url)
+        self.assertNotContains(response, 'btn btn-sm btn-primary')
+        self.assertContains(response, '♥ 1')
+        self.assertFalse(any(
+            'LIMIT' in query['sql'] and '"posts_post"."text"' in query['sql']
+            for query in context.captured_queries))
+
+    def test_recount_rebuilds_shards(self):
+        """Пересчёт исправляет разошедшиеся шарды."""
+        reactions.like(self.readers[0], self.post.id)
+        ReactionCounter.objects.update(count=5)
+        self.assertEqual(counters.recount()['ReactionCounter.count'], 1)
+        self.assertEqual(self.likes(), 1)
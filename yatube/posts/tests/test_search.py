@@ -0,0 +1,54 @@
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+SLUG = 'test-slug'
+SEARCH_URL = reverse('posts:search')
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=SLUG,
+            description='Тестовое описание',
+        )
+        cls.cats = Post.objects.create(
+            author=cls.user, text='Коты спят весь день', group=cls.group)
+        cls.dogs = Post.objects.create(
+            author=cls.user, text='Собаки гуляют, коты смотрят')
+        Post.objects.create(author=cls.user, text='Совсем другое')
+
+    def setUp(self):
+        self.client = Client()
+
+    def found(self, **params):
+        response = self.client.get(SEARCH_URL, params)
+        return set(response.context['page_obj'])
+
+    def test_search_by_word_and_prefix(self):
+        """Поиск находит посты по слову и по префиксу."""
+        self.assertEqual(self.found(q='коты'), {self.cats, self.dogs})
+        self.assertEqual(self.found(q='соба*'), {self.dogs})
+
+    def test_search_filters_by_group(self):
+        """Фильтр по группе сужает результаты."""
+        self.assertEqual(self.found(q='коты', group=SLUG), {self.cats})
+
+    def test_index_follows_edit_and_delete(self):
+        """Правка и удаление поста сразу отражаются в поиске."""
+        cats = Post.objects.get(pk=self.cats.pk)
+        cats.text = 'Хомяки'
+        cats.save()
+        self.assertEqual(self.found(q='коты'), {self.dogs})
+        Post.objects.get(pk=self.dogs.pk).delete()
+        self.assertEqual(self.found(q='коты'), set())
+
+    def test_query_syntax_is_escaped(self):
+        """Спецсимволы FTS5 в запросе не приводят к ошибке."""
+        response = self.client.get(SEARCH_URL, {'q': '"коты" OR ('})
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,101 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import derivatives, thumbnails
+from posts.models import ImageDerivative, Post, ThumbnailJob, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+POST_CREATE_URL = reverse('posts:post_create')
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailQueueTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='author')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.author = Client()
+        self.author.force_login(self.user)
+        self.author.post(POST_CREATE_URL, data={
+            'text': 'Пост с картинкой',
+            'image': SimpleUploadedFile(
+                name='small.gif', content=SMALL_GIF,
+                content_type='image/gif'),
+        })
+        self.post = Post.objects.get(text='Пост с картинкой')
+
+    def test_upload_enqueues_job_and_shows_placeholder(self):
+        """Загрузка картинки ставит задание, пост показывает заглушку."""
+        self.assertFalse(self.post.thumbnails_ready)
+        self.assertTrue(ThumbnailJob.objects.filter(post=self.post).exists())
+        response = self.author.get(
+            reverse('posts:post_detail', args=[self.post.id]))
+        self.assertContains(response, 'img/placeholder.svg')
+
+    def test_worker_builds_every_geometry(self):
+        """Обработчик строит все размеры и снимает задание с очереди."""
+        with mock.patch('posts.thumbnails.get_thumbnail') as get_thumbnail:
+            self.assertEqual(thumbnails.drain(), 1)
+        self.assertEqual(
+            ImageDerivative.objects.filter(post=self.post).count(),
+            len(settings.DERIVATIVE_WIDTHS) * len(settings.DERIVATIVE_FORMATS)
+        )
+        self.assertEqual(
+            get_thumbnail.call_count, len(settings.THUMBNAIL_GEOMETRIES))
+        self.post.refresh_from_db()
+        self.assertTrue(self.post.thumbnails_ready)
+        self.assertEqual(thumbnails.pending(), 0)
+
+    def test_worker_retries_failures(self):
+        """Ошибка генерации оставляет задание для повторной попытки."""
+        with mock.patch('posts.thumbnails.get_thumbnail',
+                        side_effect=OSError):
+            self.assertEqual(thumbnails.drain(), 0)
+        self.assertEqual(ThumbnailJob.objects.get().attempts, 1)
+
+    def test_derivatives_render_srcset(self):
+        """Готовые копии выводятся через srcset с ленивой загрузкой."""
+        derivatives.build(self.post)
+        thumbnails.mark_ready(self.post)
+        response = self.author.get(
+            reverse('posts:post_detail', args=[self.post.id]))
+        self.assertContains(response, 'type="image/webp"')
+        self.assertContains(response, 'loading="lazy"')
+        for width in settings.DERIVATIVE_WIDTHS:
+            self.assertContains(response, f'{width}w')
+
+    def test_new_upload_during_processing_keeps_job(self):
+        """Картинка, загруженная во время обработки, остаётся в очереди."""
+        job = ThumbnailJob.objects.get()
+
+        def upload_again(*args, **kwargs):
+            thumbnails.enqueue(self.post)
+
+        with mock.patch('posts.thumbnails.get_thumbnail',
+                        side_effect=upload_again):
+            self.assertFalse(thumbnails.process(job))
+        self.assertEqual(thumbnails.pending(), 1)
+        self.post.refresh_from_db()
+        self.assertFalse(self.post.thumbnails_ready)
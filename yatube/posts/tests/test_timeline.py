@@ -0,0 +1,66 @@
+from unittest import mock
+
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import timeline
+from posts.models import FanOutJob, Post, TimelineEntry, User
+
+USERNAME = 'author'
+FOLLOW_INDEX_URL = reverse('posts:follow_index')
+FOLLOW_PROFILE_URL = reverse('posts:profile_follow', args=[USERNAME])
+UNFOLLOW_PROFILE_URL = reverse('posts:profile_unfollow', args=[USERNAME])
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username=USERNAME)
+        cls.follower = User.objects.create(username='follower')
+        cls.post = Post.objects.create(author=cls.user, text='Старый пост')
+
+    def setUp(self):
+        self.follower_client = Client()
+        self.follower_client.force_login(self.follower)
+
+    def test_follow_backfills_and_unfollow_prunes_timeline(self):
+        """Подписка заполняет ленту постами автора, отписка очищает её."""
+        self.follower_client.get(FOLLOW_PROFILE_URL)
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.follower, post=self.post).exists())
+        self.follower_client.get(UNFOLLOW_PROFILE_URL)
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=self.follower).exists())
+
+    def test_new_post_fans_out_to_followers(self):
+        """Новый пост попадает в ленту подписчика первым."""
+        self.follower_client.get(FOLLOW_PROFILE_URL)
+        new_post = Post.objects.create(author=self.user, text='Новый пост')
+        response = self.follower_client.get(FOLLOW_INDEX_URL)
+        self.assertEqual(
+            list(response.context['page_obj']), [new_post, self.post])
+
+    def test_backfill_takes_latest_posts(self):
+        """Подписка добавляет в ленту только последние посты автора."""
+        newer = Post.objects.create(author=self.user, text='Новый пост')
+        with mock.patch('posts.timeline.TIMELINE_BACKFILL_POSTS', 1):
+            self.follower_client.get(FOLLOW_PROFILE_URL)
+        self.assertEqual(
+            list(TimelineEntry.objects.filter(
+                user=self.follower).values_list('post_id', flat=True)),
+            [newer.id])
+
+    def test_popular_author_post_queued(self):
+        """Пост популярного автора раскладывается из очереди."""
+        self.follower_client.get(FOLLOW_PROFILE_URL)
+        with mock.patch('posts.timeline.TIMELINE_FANOUT_LIMIT', 0):
+            new_post = Post.objects.create(author=self.user, text='Новый')
+        entries = TimelineEntry.objects.filter(post=new_post)
+        self.assertFalse(entries.exists())
+        self.assertTrue(FanOutJob.objects.filter(post=new_post).exists())
+        self.assertEqual(timeline.drain(), 1)
+        self.assertEqual(
+            list(entries.values_list('user_id', flat=True)),
+            [self.follower.id])
+        self.assertEqual(timeline.pending(), 0)
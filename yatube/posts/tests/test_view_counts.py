@@ -0,0 +1,77 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Post, User
+from posts.view_counts import ViewCountBuffer, buffer
+
+
+class ViewCountBufferTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        author = User.objects.create(username='author')
+        cls.posts = [
+            Post.objects.create(author=author, text=f'Пост {number}')
+            for number in range(2)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        buffer.counts.clear()
+
+    def views(self, post):
+        return Post.objects.get(pk=post.pk).views_count
+
+    def test_flush_writes_all_posts_in_one_query(self):
+        """Накопленные просмотры пишутся одним запросом."""
+        counter = ViewCountBuffer(interval=3600, size=100)
+        for post in self.posts * 3:
+            counter.add(post.id)
+        self.assertEqual(counter.pending(), 6)
+        self.assertEqual(self.views(self.posts[0]), 0)
+        with self.assertNumQueries(1):
+            counter.flush()
+        self.assertEqual(counter.pending(), 0)
+        self.assertEqual(self.views(self.posts[0]), 3)
+        self.assertEqual(self.views(self.posts[1]), 3)
+
+    def test_flush_after_size_increments(self):
+        """Буфер сбрасывается сам, набрав size просмотров."""
+        counter = ViewCountBuffer(interval=3600, size=2)
+        counter.add(self.posts[0].id)
+        self.assertEqual(self.views(self.posts[0]), 0)
+        counter.add(self.posts[0].id)
+        self.assertEqual(self.views(self.posts[0]), 2)
+
+    def test_failed_flush_keeps_counts(self):
+        """При ошибке записи просмотры возвращаются в буфер."""
+        counter = ViewCountBuffer(interval=3600, size=100)
+        counter.add(self.posts[0].id)
+        with mock.patch.object(Post.objects, 'filter',
+                               side_effect=RuntimeError), \
+                self.assertLogs('posts.view_counts', 'ERROR'):
+            counter.flush()
+        self.assertEqual(counter.pending(self.posts[0].id), 1)
+
+    def test_post_detail_shows_buffered_views(self):
+        """Страница поста учитывает ещё не записанные просмотры."""
+        url = reverse('posts:post_detail', args=[self.posts[0].id])
+        self.client.get(url)
+        response = self.client.get(url)
+        self.assertContains(response, 'Просмотров: 2')
+
+    def test_cached_page_counts_views(self):
+        """Просмотры страницы из кеша тоже учитываются."""
+        url = reverse('posts:post_detail', args=[self.posts[0].id])
+        for _ in range(3):
+            self.client.get(url)
+        self.assertEqual(buffer.pending(self.posts[0].id), 3)
+
+    def test_pending_exposed_as_metric(self):
+        """Размер буфера виден в /metrics/."""
+        buffer.add(self.posts[0].id)
+        response = self.client.get(reverse('metrics'))
+        self.assertContains(response, 'post_views_pending 1')
@@ -7,6 +7,7 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
+from posts import counters, timeline
 from posts.models import Follow, Group, Post, User
 
 from yatube.settings import POSTS_PER_PAGE
@@ -89,7 +90,8 @@ class PostURLTests(TestCase):
         """Проверяем кеширования главной страницы"""
         response = self.client.get(HOME_URL)
         cache_check = response.content
-        Post.objects.all().delete()
+        # Изменение в обход сигналов не меняет версию и не сбрасывает кеш
+        Post.objects.update(text='Текст изменён в обход сигналов')
         response_old = self.client.get(HOME_URL)
         cache_old_check = response_old.content
         self.assertEqual(cache_old_check, cache_check)
@@ -98,6 +100,18 @@ class PostURLTests(TestCase):
         cache_new_check = response_new.content
         self.assertNotEqual(cache_old_check, cache_new_check)
 
+    def test_cache_index_page_invalidated_on_write(self):
+        """Удаление и правка поста сразу сбрасывают кеш главной"""
+        cache_check = self.client.get(HOME_URL).content
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Отредактированный текст'
+        post.save()
+        edited = self.client.get(HOME_URL).content
+        self.assertNotEqual(edited, cache_check)
+        self.assertIn(post.text.encode(), edited)
+        Post.objects.all().delete()
+        self.assertNotIn(post.text.encode(), self.client.get(HOME_URL).content)
+
     def test_pages_show_correct_context(self):
         """Шаблоны сформированы с правильным контекстом."""
         urls = {
@@ -150,6 +164,10 @@ class PostURLTests(TestCase):
                  group=self.group)
             for i in range(POSTS_PER_PAGE + PAGE_2_POSTS)
         )
+        # bulk_create не отправляет сигналы, раскладываем ленты
+        # и пересчитываем счётчики вручную
+        timeline.fan_out_posts(Post.objects.all())
+        counters.recount()
         test_cases = {
             HOME_URL: POSTS_PER_PAGE,
             HOME_URL_2_PAGE: PAGE_2_POSTS,
@@ -0,0 +1,82 @@
+"""Фоновая подготовка миниатюр картинок постов.
+
+Загрузка картинки ставит пост в очередь ThumbnailJob, а команда
+generate_thumbnails разбирает очередь и заранее строит все размеры
+из THUMBNAIL_GEOMETRIES и адаптивные копии (см. derivatives). Пока
+миниатюры не готовы, шаблоны показывают заглушку вместо генерации
+картинки во время запроса.
+"""
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+from sorl.thumbnail import get_thumbnail
+
+from yatube.settings import THUMBNAIL_GEOMETRIES, THUMBNAIL_MAX_ATTEMPTS
+
+from . import derivatives
+from .models import ThumbnailJob
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(post):
+    """Ставит пост в очередь; вызывается после сохранения новой картинки.
+
+    Задание, которое уже есть, получает новую дату создания: так
+    обработчик старой картинки узнаёт, что его результат устарел.
+    """
+    ThumbnailJob.objects.update_or_create(
+        post=post, defaults={'attempts': 0, 'created': timezone.now()})
+
+
+def enqueue_many(posts):
+    ThumbnailJob.objects.bulk_create(
+        (ThumbnailJob(post=post) for post in posts if post.image),
+        ignore_conflicts=True,
+    )
+
+
+def generate(post):
+    for geometry, options in THUMBNAIL_GEOMETRIES:
+        get_thumbnail(post.image, geometry, **options)
+    derivatives.build(post)
+
+
+def mark_ready(post):
+    post.thumbnails_ready = True
+    post.save(update_fields=['thumbnails_ready', 'modified'])
+
+
+def process(job):
+    """Выполняет задание; возвращает True, если миниатюры построены."""
+    post = job.post
+    # Пока шла генерация, могли загрузить новую картинку: enqueue
+    # обновил created, и задание остаётся в очереди для неё
+    same_job = ThumbnailJob.objects.filter(pk=job.pk, created=job.created)
+    try:
+        if post.image:
+            generate(post)
+    except Exception:
+        job.attempts += 1
+        logger.exception('Не удалось построить миниатюры поста %s', post.pk)
+        if job.attempts < THUMBNAIL_MAX_ATTEMPTS:
+            same_job.update(attempts=job.attempts)
+            return False
+        # Сдаёмся: шаблон построит миниатюру сам, как до очереди
+    with transaction.atomic():
+        deleted, _ = same_job.delete()
+        if not deleted:
+            return False
+        mark_ready(post)
+    return True
+
+
+def drain(limit=100):
+    """Обрабатывает до limit заданий; возвращает число выполненных."""
+    jobs = ThumbnailJob.objects.select_related('post')[:limit]
+    return sum(process(job) for job in jobs)
+
+
+def pending():
+    return ThumbnailJob.objects.count()
@@ -0,0 +1,130 @@
+"""Материализованные ленты подписок (fan-out-on-write).
+
+Каждый новый пост сразу раскладывается по лентам подписчиков автора,
+поэтому страница /follow/ читает одну индексированную выборку
+из TimelineEntry вместо соединения Post с Follow. Посты авторов,
+у которых подписчиков больше TIMELINE_FANOUT_LIMIT, раскладывает
+команда fan_out_timelines из очереди FanOutJob: в запросе публикации
+это заняло бы блокировку записи на время вставки всех строк.
+"""
+from core import versions
+from yatube.settings import TIMELINE_BACKFILL_POSTS, TIMELINE_FANOUT_LIMIT
+
+from .models import AuthorStats, FanOutJob, Follow, Post, TimelineEntry
+
+BATCH_SIZE = 500
+
+
+def _entry(user_id, post):
+    return TimelineEntry(
+        user_id=user_id,
+        post_id=post.id,
+        author_id=post.author_id,
+        pub_date=post.pub_date,
+    )
+
+
+def fan_out(post):
+    """Добавляет пост в ленты всех подписчиков автора."""
+    fan_out_posts([post])
+
+
+def fan_out_posts(posts):
+    """Раскладывает посты по лентам подписчиков их авторов.
+
+    Посты популярных авторов только ставятся в очередь FanOutJob.
+    """
+    posts = list(posts)
+    popular = set(AuthorStats.objects.filter(
+        pk__in={post.author_id for post in posts},
+        followers_count__gt=TIMELINE_FANOUT_LIMIT,
+    ).values_list('pk', flat=True))
+    if popular:
+        FanOutJob.objects.bulk_create(
+            (FanOutJob(post=post) for post in posts
+             if post.author_id in popular),
+            ignore_conflicts=True,
+        )
+        posts = [post for post in posts if post.author_id not in popular]
+    followers = {}
+    for user_id, author_id in Follow.objects.filter(
+        author_id__in={post.author_id for post in posts}
+    ).values_list('user_id', 'author_id'):
+        followers.setdefault(author_id, []).append(user_id)
+    TimelineEntry.objects.bulk_create(
+        (
+            _entry(user_id, post)
+            for post in posts
+            for user_id in followers.get(post.author_id, ())
+        ),
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def process(job):
+    """Раскладывает пост из очереди пачками по BATCH_SIZE подписчиков.
+
+    Каждая пачка — отдельная транзакция, чтобы между ними могли
+    писать другие запросы.
+    """
+    post = job.post
+    followers = Follow.objects.filter(
+        author_id=post.author_id).order_by('user_id')
+    last_user_id = 0
+    while True:
+        user_ids = list(followers.filter(
+            user_id__gt=last_user_id
+        ).values_list('user_id', flat=True)[:BATCH_SIZE])
+        if not user_ids:
+            break
+        TimelineEntry.objects.bulk_create(
+            (_entry(user_id, post) for user_id in user_ids),
+            ignore_conflicts=True,
+        )
+        last_user_id = user_ids[-1]
+    job.delete()
+
+
+def drain(limit=10):
+    """Обрабатывает до limit заданий; возвращает число выполненных."""
+    jobs = list(FanOutJob.objects.select_related('post')[:limit])
+    for job in jobs:
+        process(job)
+    if jobs:
+        versions.bump('timelines')
+    return len(jobs)
+
+
+def pending():
+    return FanOutJob.objects.count()
+
+
+def backfill(user_id, author_id):
+    """Добавляет в ленту пользователя последние посты автора после подписки.
+
+    Берутся только TIMELINE_BACKFILL_POSTS постов: подписка на автора
+    с тысячами постов не должна вставлять их все в запросе.
+    """
+    TimelineEntry.objects.bulk_create(
+        (
+            _entry(user_id, post)
+            for post in Post.objects.filter(author_id=author_id).only(
+                'id', 'author_id', 'pub_date'
+            ).order_by('-pub_date', '-id')[:TIMELINE_BACKFILL_POSTS]
+        ),
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def prune(user_id, author_id):
+    """Убирает посты автора из ленты пользователя после отписки."""
+    TimelineEntry.objects.filter(
+        user_id=user_id, author_id=author_id
+    ).delete()
+
+
+def get_timeline(user):
+    """Записи ленты пользователя, от новых к старым."""
+    return TimelineEntry.objects.filter(user=user).only('post_id', 'pub_date')
@@ -1,19 +1,36 @@
 from django.urls import path
 
-from . import views
+from . import feeds, views
 
 app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('rss/', feeds.cached_feed(feeds.LatestPostsFeed), name='rss'),
+    path('atom/', feeds.cached_feed(feeds.LatestPostsAtomFeed), name='atom'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path('group/<slug:slug>/rss/', feeds.cached_feed(feeds.GroupPostsFeed),
+         name='group_rss'),
+    path('group/<slug:slug>/atom/',
+         feeds.cached_feed(feeds.GroupPostsAtomFeed), name='group_atom'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path('profile/<str:username>/rss/',
+         feeds.cached_feed(feeds.AuthorPostsFeed), name='profile_rss'),
+    path('profile/<str:username>/atom/',
+         feeds.cached_feed(feeds.AuthorPostsAtomFeed), name='profile_atom'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('search/', views.search_posts, name='search'),
+    path('export/<slug:stream>/', views.export_stream, name='export'),
     path('profile/<str:username>/follow/', views.profile_follow,
          name='profile_follow'),
     path('profile/<str:username>/unfollow/', views.profile_unfollow,
          name='profile_unfollow'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('posts/<int:post_id>/comments/', views.post_comments,
+         name='post_comments'),
+    path('posts/<int:post_id>/like/', views.post_like, name='post_like'),
+    path('posts/<int:post_id>/unlike/', views.post_unlike,
+         name='post_unlike'),
     path('posts/<int:post_id>/comment/', views.add_comment,
          name='add_comment'),
     path('create/', views.post_create, name='post_create'),
@@ -0,0 +1,28 @@
+from django.db.models import Max
+
+from .models import Post
+
+
+def hydrate_posts(post_ids, queryset=None):
+    """Загружает посты по списку идентификаторов, сохраняя порядок."""
+    if queryset is None:
+        queryset = Post.objects.select_related('author', 'group')
+    posts = queryset.in_bulk(post_ids)
+    return [posts[post_id] for post_id in post_ids if post_id in posts]
+
+
+def bulk_create_posts(posts, batch_size=None):
+    """bulk_create с заполнением pk у созданных постов.
+
+    SQLite не возвращает id из bulk_create; внутри транзакции новые
+    строки — ровно те, что больше прежнего максимума, и идут они
+    в порядке вставки.
+    """
+    last_id = Post.objects.aggregate(last=Max('id'))['last'] or 0
+    Post.objects.bulk_create(posts, batch_size=batch_size)
+    if posts and posts[0].pk is None:
+        ids = Post.objects.filter(id__gt=last_id).order_by(
+            'id').values_list('id', flat=True)
+        for post, pk in zip(posts, ids):
+            post.pk = pk
+    return posts
@@ -0,0 +1,78 @@
+"""Буферизованный счётчик просмотров постов.
+
+Просмотры копятся в памяти процесса по id поста и записываются одним
+UPDATE ... CASE, когда с прошлой записи прошло
+VIEW_COUNTS_FLUSH_INTERVAL секунд или набралось VIEW_COUNTS_FLUSH_SIZE
+просмотров. При штатной остановке процесса буфер сбрасывается
+через atexit, при аварийной теряется не больше одного буфера.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.db import connection
+from django.db.models import Case, F, Value, When
+
+from core import metrics
+from yatube.settings import VIEW_COUNTS_FLUSH_INTERVAL, VIEW_COUNTS_FLUSH_SIZE
+
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCountBuffer:
+    def __init__(self, interval=VIEW_COUNTS_FLUSH_INTERVAL,
+                 size=VIEW_COUNTS_FLUSH_SIZE):
+        self.interval = interval
+        self.size = size
+        self.lock = threading.Lock()
+        self.counts = {}
+        self.flushed = time.monotonic()
+        self.database = None
+
+    def add(self, post_id):
+        with self.lock:
+            if not self.counts:
+                self.database = connection.settings_dict['NAME']
+            self.counts[post_id] = self.counts.get(post_id, 0) + 1
+            due = (
+                sum(self.counts.values()) >= self.size
+                or time.monotonic() - self.flushed >= self.interval
+            )
+        if due:
+            self.flush()
+
+    def pending(self, post_id=None):
+        """Ещё не записанные просмотры поста или всего буфера."""
+        if post_id is not None:
+            return self.counts.get(post_id, 0)
+        return sum(self.counts.values())
+
+    def flush(self):
+        with self.lock:
+            counts, self.counts = self.counts, {}
+            self.flushed = time.monotonic()
+        # Просмотры, накопленные для другой базы (например, удалённой
+        # тестовой), в текущую не пишем
+        if not counts or self.database != connection.settings_dict['NAME']:
+            return
+        try:
+            # один UPDATE — одна транзакция для всех постов буфера
+            Post.objects.filter(pk__in=counts).update(
+                views_count=F('views_count') + Case(
+                    *(When(pk=pk, then=Value(delta))
+                      for pk, delta in counts.items())
+                )
+            )
+        except Exception:
+            logger.exception('Не удалось записать просмотры постов')
+            with self.lock:
+                for pk, delta in counts.items():
+                    self.counts[pk] = self.counts.get(pk, 0) + delta
+
+
+buffer = ViewCountBuffer()
+atexit.register(buffer.flush)
+metrics.register('post_views_pending', buffer.pending)
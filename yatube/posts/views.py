@@ -1,59 +1,194 @@
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import prefetch_related_objects
+from django.http import (Http404, HttpResponseBadRequest, JsonResponse,
+                         StreamingHttpResponse)
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.functional import SimpleLazyObject
+from django.utils.http import is_safe_url
+from django.views.decorators.http import require_POST
 
-from yatube.settings import POSTS_PER_PAGE
+from core import holes, versions
+from core.budgets import query_budget
+from core.page_cache import page_cache
+from core.paginator import CursorPaginator, ElidedPaginator, cached_count
+from yatube.settings import (COMMENTS_PER_PAGE, FEED_CACHE_TIMEOUT,
+                             INDEX_CACHE_TIMEOUT, POSTS_PER_PAGE)
 
+from . import (export, lookups, reactions, search, thumbnails, timeline,
+               view_counts)
 from .forms import CommentForm, PostForm
 from .models import Follow, Group, Post, User
+from .utils import hydrate_posts
 
 
-def get_paginated_page(request, posts):
-    return Paginator(posts, POSTS_PER_PAGE).get_page(request.GET.get('page'))
+def get_paginated_page(request, posts, keys=('pub_date', 'id'), count=None):
+    paginator = CursorPaginator(posts, POSTS_PER_PAGE, keys, count=count)
+    after, before = request.GET.get('after'), request.GET.get('before')
+    if 'page' in request.GET and not (after or before):
+        # Старые ссылки вида ?page=N обслуживаем через OFFSET
+        return paginator.get_page(request.GET['page'])
+    return paginator.get_cursor_page(after=after, before=before)
 
 
+def feed_posts(request, posts):
+    """Посты ленты с авторами, группами и реакциями одним запросом.
+
+    На страницах с дырками реакции рисует рендерер like_bar.
+    """
+    posts = posts.select_related('author', 'group')
+    if holes.deferred(request):
+        return posts
+    return reactions.with_reactions(posts, request.user)
+
+
+def feed_cache(*namespaces):
+    """Параметры кеша фрагмента ленты: срок жизни и версия данных."""
+    return {
+        'cache_timeout': FEED_CACHE_TIMEOUT,
+        'cache_version': versions.get_version(*namespaces),
+    }
+
+
+@query_budget(5)
+@page_cache('posts')
 def index(request):
+    # Ленту отдаёт кешированный фрагмент, поэтому страница считается
+    # лениво: при попадании в кеш запроса ленты нет вовсе. Реакции
+    # в нём — метки дырок, их заполняет PageCacheMiddleware.
     return render(request, 'posts/index.html', {
-        'page_obj': get_paginated_page(request, Post.objects.all()),
+        'page_obj': SimpleLazyObject(lambda: get_paginated_page(
+            request, feed_posts(request, Post.objects.all()),
+            count=lambda: cached_count(Post.objects.all(), 'posts'))),
+        'cache_timeout': INDEX_CACHE_TIMEOUT,
+        'cache_version': versions.get_version('posts'),
     })
 
 
+@query_budget(5)
+@page_cache('posts')
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
+    group = lookups.get_object_or_404(Group, slug=slug)
     return render(request, 'posts/group_list.html', {
         'group': group,
-        'page_obj': get_paginated_page(request, group.posts.all())
+        'page_obj': SimpleLazyObject(lambda: get_paginated_page(
+            request, feed_posts(request, group.posts.all()),
+            count=group.posts_count)),
+        **feed_cache(f'group:{group.id}', 'users'),
     })
 
 
+# Без кеша: сессия, пользователь, автор, его счётчики, лента и две
+# дырки — лайки и кнопка подписки; при попадании во фрагмент ленты нет
+@query_budget(7)
+@page_cache('posts', 'follows')
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    following = False
-    if request.user.is_authenticated:
-        following = Follow.objects.filter(
-            user=request.user,
-            author=author
-        ).exists()
+    author = lookups.get_object_or_404(User, username=username)
     return render(request, 'posts/profile.html', {
         'author': author,
-        'following': following,
-        'page_obj': get_paginated_page(request,
-                                       author.posts.all()),
+        'page_obj': SimpleLazyObject(lambda: get_paginated_page(
+            request, feed_posts(request, author.posts.all()),
+            count=author.stats.posts_count)),
+        **feed_cache(f'author:{author.id}', 'groups'),
+    })
+
+
+@query_budget(6)
+def search_posts(request):
+    text = request.GET.get('q', '').strip()
+    group = author = None
+    if request.GET.get('group'):
+        group = lookups.get(Group, request.GET['group'])
+    if request.GET.get('author'):
+        author = lookups.get(User, request.GET['author'])
+    hits = search.search(
+        text,
+        group_id=group.id if group else None,
+        author_id=author.id if author else None,
+    )
+    page = ElidedPaginator(hits, POSTS_PER_PAGE).get_page(
+        request.GET.get('page'))
+    page.object_list = hydrate_posts(
+        list(page.object_list), feed_posts(request, Post.objects.all()))
+    query = request.GET.copy()
+    query.pop('page', None)
+    return render(request, 'posts/search.html', {
+        'query': text,
+        'group': group,
+        'author': author,
+        'page_obj': page,
+        'page_query': f'{query.urlencode()}&' if query else '',
     })
 
 
+def post_author(view_kwargs):
+    # На странице имя автора и число его постов. Пока автор поста
+    # неизвестен кешу, страница зависит от всех постов
+    author_id = lookups.post_author_id(view_kwargs['post_id'])
+    return 'posts' if author_id is None else f'author:{author_id}'
+
+
+# Сессия, пользователь, пост, копии картинки и комментарии — пять
+# запросов; шестой — сброс буфера просмотров, который раз в интервал
+# выпадает на чей-то запрос (см. view_counts)
+@query_budget(6)
+@page_cache(
+    'post:{post_id}', 'comments:{post_id}', post_author, 'users', 'groups')
 def post_detail(request, post_id):
     form = CommentForm(request.POST or None)
-    post = get_object_or_404(Post, pk=post_id)
-    comments = post.comments.all()
+    post = get_object_or_404(
+        reactions.with_reactions(
+            Post.objects.select_related('author__stats', 'group'),
+            request.user),
+        pk=post_id)
+    lookups.remember_post_author(post)
+    if post.image and post.thumbnails_ready:
+        prefetch_related_objects([post], 'derivatives')
+    # На кешируемой странице просмотр учтёт рендерер дырки views_count:
+    # он работает и тогда, когда страница отдаётся из кеша без view
+    if not holes.deferred(request):
+        # к записанному в БД добавляем ещё не сброшенные и текущий просмотр
+        post.views_count += view_counts.buffer.pending(post.id) + 1
+        view_counts.buffer.add(post.id)
     return render(request, 'posts/post_detail.html', {
         'post': post,
         'form': form,
-        'comments': comments,
+        'comments': get_comments_page(request, post),
     })
 
 
+def get_comments_page(request, post):
+    """Страница комментариев по курсору (created, id), авторы — JOIN."""
+    paginator = CursorPaginator(
+        post.comments.select_related('author'), COMMENTS_PER_PAGE,
+        keys=('created', 'id'), count=post.comments_count)
+    return paginator.get_cursor_page(after=request.GET.get('after'))
+
+
+@query_budget(2)
+def post_comments(request, post_id):
+    """Следующая страница комментариев фрагментом для «Показать ещё»."""
+    post = get_object_or_404(
+        Post.objects.only('id', 'comments_count'), pk=post_id)
+    return render(request, 'includes/comments.html', {
+        'post': post,
+        'comments': get_comments_page(request, post),
+    })
+
+
+def save_with_thumbnails(form, post):
+    """Сохраняет пост и ставит новую картинку в очередь на миниатюры."""
+    new_image = 'image' in form.changed_data and bool(post.image)
+    if new_image:
+        post.thumbnails_ready = False
+    post.save()
+    if new_image:
+        thumbnails.enqueue(post)
+
+
 @login_required
+@transaction.atomic
 def post_create(request):
     form = PostForm(
         request.POST or None,
@@ -63,11 +198,12 @@ def post_create(request):
         return render(request, 'posts/create_post.html', {'form': form})
     post = form.save(commit=False)
     post.author = request.user
-    post.save()
+    save_with_thumbnails(form, post)
     return redirect('posts:profile', request.user)
 
 
 @login_required
+@transaction.atomic
 def post_edit(request, post_id):
     post = get_object_or_404(Post, id=post_id)
     if request.user != post.author:
@@ -82,11 +218,12 @@ def post_edit(request, post_id):
             'form': form,
             'post': post
         })
-    form.save()
+    save_with_thumbnails(form, form.save(commit=False))
     return redirect('posts:post_detail', post_id=post_id)
 
 
 @login_required
+@transaction.atomic
 def add_comment(request, post_id):
     post = get_object_or_404(Post, id=post_id)
     form = CommentForm(request.POST or None)
@@ -98,24 +235,85 @@ def add_comment(request, post_id):
     return redirect('posts:post_detail', post_id=post_id)
 
 
+@query_budget(6)
 @login_required
 def follow_index(request):
-    posts = Post.objects.filter(author__following__user=request.user)
+    entries = timeline.get_timeline(request.user)
+    page = get_paginated_page(
+        request, entries, keys=('pub_date', 'post_id'),
+        count=lambda: cached_count(
+            entries, 'posts', 'timelines',
+            f'timeline:{request.user.id}'))
+    page.object_list = hydrate_posts(
+        [entry.post_id for entry in page],
+        feed_posts(request, Post.objects.all()))
     return render(request, 'posts/follow.html', {
-        'page_obj': get_paginated_page(request, posts)
+        'page_obj': page
     })
 
 
 @login_required
+@transaction.atomic
 def profile_follow(request, username):
-    author = get_object_or_404(User, username=username)
+    author = lookups.get_object_or_404(User, username=username)
     if request.user != author:
         Follow.objects.get_or_create(user=request.user, author=author)
     return redirect('posts:profile', author)
 
 
 @login_required
+@transaction.atomic
 def profile_unfollow(request, username):
-    author = get_object_or_404(User, username=username)
+    author = lookups.get_object_or_404(User, username=username)
     Follow.objects.filter(user=request.user, author=author).delete()
     return redirect('posts:profile', author)
+
+
+def reaction_response(request, post_id):
+    """JSON для запросов из скрипта, иначе возврат на прежнюю страницу."""
+    if 'application/json' in request.META.get('HTTP_ACCEPT', ''):
+        post = reactions.with_reactions(
+            Post.objects.filter(pk=post_id), request.user
+        ).values('likes_count', 'liked').get()
+        return JsonResponse(post)
+    next_url = request.POST.get('next')
+    if next_url and is_safe_url(next_url, {request.get_host()}):
+        return redirect(next_url)
+    return redirect('posts:post_detail', post_id=post_id)
+
+
+@login_required
+@require_POST
+def post_like(request, post_id):
+    get_object_or_404(Post.objects.only('id'), pk=post_id)
+    reactions.like(request.user, post_id)
+    return reaction_response(request, post_id)
+
+
+@login_required
+@require_POST
+def post_unlike(request, post_id):
+    get_object_or_404(Post.objects.only('id'), pk=post_id)
+    reactions.unlike(request.user, post_id)
+    return reaction_response(request, post_id)
+
+
+@staff_member_required
+def export_stream(request, stream):
+    if stream not in export.STREAMS:
+        raise Http404
+    since = None
+    if request.GET.get('since'):
+        try:
+            since = export.parse_since(request.GET['since'])
+        except ValueError as error:
+            return HttpResponseBadRequest(str(error))
+    compress = bool(request.GET.get('gzip'))
+    filename = f'{stream}.ndjson' + ('.gz' if compress else '')
+    response = StreamingHttpResponse(
+        export.export(stream, since, compress),
+        content_type='application/gzip' if compress
+        else 'application/x-ndjson',
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
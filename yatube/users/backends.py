@@ -0,0 +1,32 @@
+"""Бэкенд аутентификации с пользователем из кеша.
+
+AuthenticationMiddleware на каждом запросе вошедшего загружает
+пользователя по id из сессии. CachedModelBackend берёт его из кеша,
+а сигналы users.signals удаляют запись при сохранении и удалении
+пользователя: смена пароля, профиля или прав видна сразу.
+"""
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+from yatube.settings import USER_CACHE_TIMEOUT
+
+KEY_PREFIX = 'user'
+
+
+def user_key(user_id):
+    return f'{KEY_PREFIX}:{user_id}'
+
+
+def forget_user(user_id):
+    cache.delete(user_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        user = cache.get(user_key(user_id))
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(user_key(user_id), user, USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+User = get_user_model()
+
+FOLLOW_URL = reverse('posts:follow_index')
+
+
+class CachedAuthTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='reader', password='old-password-1')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.client.get(FOLLOW_URL)
+
+    def test_no_session_or_user_queries(self):
+        """Сессия и пользователь вошедшего берутся из кеша."""
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('about:author'))
+            self.assertEqual(response.wsgi_request.user, self.user)
+
+    def test_profile_change_visible(self):
+        """Изменённый профиль пользователя сразу виден в запросе."""
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Новое имя'
+        user.save()
+        response = self.client.get(reverse('about:author'))
+        self.assertEqual(response.wsgi_request.user.first_name, 'Новое имя')
+
+    def test_password_change_logs_out_other_sessions(self):
+        """После смены пароля старые сессии перестают действовать."""
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('new-password-2')
+        user.save()
+        response = self.client.get(reverse('about:author'))
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+
+    def test_inactive_user_logged_out(self):
+        """Заблокированный пользователь выходит из всех сессий."""
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        User.objects.get(pk=self.user.pk).save()
+        response = self.client.get(reverse('about:author'))
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+
+    def test_session_with_old_backend_still_valid(self):
+        """Сессия, открытая через ModelBackend, не теряется."""
+        client = Client()
+        client.force_login(
+            self.user, backend='django.contrib.auth.backends.ModelBackend')
+        response = client.get(reverse('about:author'))
+        self.assertEqual(response.wsgi_request.user, self.user)
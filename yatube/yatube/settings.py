@@ -10,7 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
+import atexit
 import os
+import shutil
+import sys
+import tempfile
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -32,13 +36,32 @@ ALLOWED_HOSTS = [
     'testserver',
 ]
 
+# Адреса, которым доступны /metrics/
+INTERNAL_IPS = [
+    '127.0.0.1',
+]
+
 # Caching backend
 
+# LRU в памяти процесса поверх общего для всех воркеров файла SQLite.
+# Тесты пишут кеш в свой временный каталог: файл кеша пережил бы тестовую
+# БД, и ключи с версиями из прошлого прогона совпали бы с ключами нового.
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'core.cache_backends.TieredCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 100_000,
+            'LOCAL_MAX_BYTES': 32 * 2 ** 20,
+            'LOCAL_TIMEOUT': 60,
+        },
     }
 }
+if TESTING:
+    CACHES['default']['LOCATION'] = tempfile.mkdtemp(prefix='yatube-cache-')
+    atexit.register(
+        shutil.rmtree, CACHES['default']['LOCATION'], ignore_errors=True)
 
 # Application definition
 
@@ -53,10 +76,12 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
     'sorl.thumbnail',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -64,17 +89,58 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.page_cache.PageCacheMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
 
+# Сессия и пользователь вошедшего читаются из кеша, а не из БД
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+# ModelBackend остаётся в списке ради сессий, открытых до перехода на
+# CachedModelBackend: в них записан его путь, и без него в списке
+# get_user разлогинил бы всех. Такие сессии читают пользователя из БД
+# до следующего входа.
+AUTHENTICATION_BACKENDS = [
+    'users.backends.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+USER_CACHE_TIMEOUT = 60 * 15
+
+# Под этим раннером превышение @query_budget проваливает тест
+TEST_RUNNER = 'core.budgets.BudgetTestRunner'
+
+# Сводка по каждому запросу пишется в лог core.middleware одной
+# JSON-строкой; запросы дольше SLOW_REQUEST_MS — с уровнем WARNING
+SLOW_REQUEST_MS = 500
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'requests': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        'core.middleware': {
+            'handlers': ['requests'],
+            'level': os.getenv(
+                'REQUEST_LOG_LEVEL', 'WARNING' if DEBUG else 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backends.TimedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -149,6 +215,56 @@ LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 
 POSTS_PER_PAGE = 10
+COMMENTS_PER_PAGE = 20
+# Ленты длиннее этого числа страниц листаются только «новее / старше»
+PAGINATOR_MAX_NUMBERED_PAGES = 500
+# Сколько последних постов отдают RSS и Atom ленты
+FEED_ITEMS = 20
+# Наибольший размер страницы API (?limit=)
+API_MAX_LIMIT = 100
+
+# Фрагменты лент инвалидируются версиями, поэтому живут долго
+FEED_CACHE_TIMEOUT = 60 * 60 * 4
+# Лента главной для гостей: свежа столько секунд, а затем ещё столько же
+# отдаётся устаревшей, пока один запрос её пересчитывает
+INDEX_CACHE_TIMEOUT = 20
+# Страницы @page_cache инвалидируются версиями; дырки пользователя
+# дорисовываются при каждой отдаче
+PAGE_CACHE_TIMEOUT = 60 * 60
+# Группы по slug и авторы по username в кеше; «не найден» — недолго
+LOOKUP_CACHE_TIMEOUT = 60 * 60
+LOOKUP_NEGATIVE_TIMEOUT = 60
+# Карточка поста в кеше привязана к дате его изменения
+CARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Подписка добавляет в ленту столько последних постов автора
+TIMELINE_BACKFILL_POSTS = 200
+# Посты автора с большим числом подписчиков раскладываются по лентам
+# командой fan_out_timelines, а не в запросе публикации
+TIMELINE_FANOUT_LIMIT = 1000
+
+# Размеры миниатюр из шаблонов: готовятся заранее командой
+# generate_thumbnails, а не при первом показе поста
+THUMBNAIL_GEOMETRIES = (
+    ('960x339', {'crop': 'center', 'upscale': True}),
+)
+THUMBNAIL_MAX_ATTEMPTS = 3
+
+# Просмотры постов пишутся в БД пачкой раз в интервал (секунды)
+# или по накоплении заданного числа просмотров
+VIEW_COUNTS_FLUSH_INTERVAL = 10
+VIEW_COUNTS_FLUSH_SIZE = 100
+
+# На сколько строк делится счётчик реакций поста
+REACTION_COUNTER_SHARDS = 8
+
+# Адаптивные копии картинок для srcset: ширины и форматы.
+# Последний формат — запасной для <img>, остальные идут в <source>;
+# при поддержке в Pillow можно добавить 'avif' в начало списка.
+DERIVATIVE_WIDTHS = (480, 960, 1440)
+DERIVATIVE_FORMATS = ('webp', 'jpeg')
+DERIVATIVE_ASPECT = (960, 339)
+DERIVATIVE_QUALITY = 80
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')